@@ -1,35 +1,123 @@
 """NetworkNest Home Assistant Integration."""
 from __future__ import annotations
 
+import asyncio
+import csv
 import logging
 import os
-from datetime import timedelta
+import shutil
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+import voluptuous as vol
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, ServiceCall
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.components import websocket_api
 from homeassistant.components.frontend import add_extra_js_url
 from homeassistant.components.http import StaticPathConfig
 from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
 
-from .const import DOMAIN, UPDATE_INTERVAL
+from .const import (
+    CONF_API_KEY,
+    CONF_BASE_URL,
+    CONF_HOST,
+    CONF_MODE,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_SCAN_SUBNETS,
+    CONF_SITE,
+    CONF_SITE_NAME,
+    CONF_SITES,
+    CONF_USERNAME,
+    CONF_VERIFY_SSL,
+    DEFAULT_PORT,
+    DEFAULT_SITE,
+    DEVICE_UPDATE_INTERVAL,
+    DOMAIN,
+    EVENT_REFRESH_COMPLETED,
+    MODE_LOCAL,
+    PROFILE_DEFAULT_DURATION,
+    PROFILE_FORMAT_FLAMEGRAPH,
+    PROFILE_FORMAT_PSTATS,
+    PROFILE_LAG_THRESHOLD,
+    PROFILE_MAX_CYCLES,
+    PROFILE_MAX_DURATION,
+    PROFILE_MAX_LAG_THRESHOLD,
+    PROFILE_MIN_LAG_THRESHOLD,
+    SAMPLE_QUERY_LIMIT,
+    UPDATE_INTERVAL,
+)
 from .api import NetworkNestAPI
+from .local import UniFiLocalCollector
+from .multisite import NetworkNestMultiSiteAPI
+from .profiler import NetworkNestProfiler
+from .samplelog import METRICS, SampleLog, samples_from_data
+from .scanner import SubnetScanner
+from .scheduler import RefreshScheduler
+
+NetworkNestClient = NetworkNestAPI | NetworkNestMultiSiteAPI | UniFiLocalCollector
 
 _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: list[Platform] = [Platform.SENSOR]
 
+DATA_PROFILING = f"{DOMAIN}_profiling"
+DATA_REFRESH_SCHEDULER = f"{DOMAIN}_refresh_scheduler"
+DATA_FRONTEND_REGISTERED = f"{DOMAIN}_frontend_registered"
+DATA_WEBSOCKET_REGISTERED = f"{DOMAIN}_websocket_registered"
+
+SERVICES = ("refresh_data", "update_device", "profile", "export_samples")
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional("duration"): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=PROFILE_MAX_DURATION)
+        ),
+        vol.Optional("cycles"): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=PROFILE_MAX_CYCLES)
+        ),
+        vol.Optional("format", default=PROFILE_FORMAT_PSTATS): vol.In(
+            [PROFILE_FORMAT_PSTATS, PROFILE_FORMAT_FLAMEGRAPH]
+        ),
+        vol.Optional("lag_threshold", default=PROFILE_LAG_THRESHOLD * 1000): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=PROFILE_MIN_LAG_THRESHOLD * 1000, max=PROFILE_MAX_LAG_THRESHOLD * 1000),
+        ),
+    }
+)
+
+EXPORT_SAMPLES_SCHEMA = vol.Schema(
+    {
+        vol.Optional("config_entry_id"): str,
+        vol.Optional("start"): vol.Any(vol.Coerce(float), str),
+        vol.Optional("end"): vol.Any(vol.Coerce(float), str),
+        vol.Optional("device_id"): str,
+        vol.Optional("metric"): vol.In(list(METRICS)),
+    }
+)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up NetworkNest from a config entry."""
     _LOGGER.info("Setting up NetworkNest integration for entry %s", entry.entry_id)
     
     try:
-        api = NetworkNestAPI(entry.data["api_key"], entry.data["base_url"])
-        _LOGGER.info("Created API client with base URL: %s", entry.data["base_url"])
+        config = {**entry.data, **entry.options}
+        api = _create_api(config)
+        
+        scanner = None
+        if subnets := config.get(CONF_SCAN_SUBNETS):
+            scanner = SubnetScanner(subnets)
+            _LOGGER.info("Created subnet scanner for %s", ", ".join(subnets))
+        
+        sample_log = SampleLog(_sample_dir(hass, entry))
         
-        coordinator = NetworkNestDataUpdateCoordinator(hass, api)
+        coordinator = NetworkNestDataUpdateCoordinator(hass, api, scanner, sample_log)
         _LOGGER.info("Created data coordinator")
         
         # Try to fetch initial data
@@ -47,6 +135,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.info("Registering services...")
         await _register_services(hass)
         
+        # Register websocket commands
+        _register_websocket_commands(hass)
+        
         # Auto-create dashboard configuration
         _LOGGER.info("Setting up dashboard configuration...")
         await _setup_dashboard_config(hass, entry)
@@ -55,19 +146,64 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         _LOGGER.info("Setting up platforms...")
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
         
+        # Reload when the options change
+        entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+        
         _LOGGER.info("NetworkNest integration setup completed successfully")
         return True
         
     except Exception as exc:
         _LOGGER.error("Failed to set up NetworkNest integration: %s", exc, exc_info=True)
         # Clean up the API client if it was created
+        hass.data.get(DOMAIN, {}).pop(entry.entry_id, None)
+        if 'coordinator' in locals():
+            await coordinator.async_shutdown()
         if 'api' in locals():
             await api.close()
         raise
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry after its options changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+def _create_api(config: dict[str, Any]) -> NetworkNestClient:
+    """Create the API client for a config entry."""
+    if config.get(CONF_MODE) == MODE_LOCAL:
+        _LOGGER.info("Created local controller collector for %s", config[CONF_HOST])
+        return UniFiLocalCollector(
+            config[CONF_HOST],
+            config[CONF_USERNAME],
+            config[CONF_PASSWORD],
+            port=config.get(CONF_PORT, DEFAULT_PORT),
+            site=config.get(CONF_SITE, DEFAULT_SITE),
+            verify_ssl=config.get(CONF_VERIFY_SSL, False),
+        )
+
+    if sites := config.get(CONF_SITES):
+        all_sites = [
+            {
+                CONF_SITE_NAME: "Main",
+                CONF_API_KEY: config[CONF_API_KEY],
+                CONF_BASE_URL: config[CONF_BASE_URL],
+            },
+            *sites,
+        ]
+        _LOGGER.info("Created multi-site API client for %d sites", len(all_sites))
+        return NetworkNestMultiSiteAPI(all_sites)
+
+    _LOGGER.info("Created API client with base URL: %s", config[CONF_BASE_URL])
+    return NetworkNestAPI(config[CONF_API_KEY], config[CONF_BASE_URL])
+
+
 async def _register_frontend_resources(hass: HomeAssistant) -> None:
     """Register frontend resources for custom cards."""
+    # Static paths and extra JS URLs live for the whole HA run; only add them once
+    if hass.data.get(DATA_FRONTEND_REGISTERED):
+        return
+    hass.data[DATA_FRONTEND_REGISTERED] = True
+    
     integration_dir = os.path.dirname(__file__)
     frontend_dir = os.path.join(integration_dir, "frontend")
     
@@ -94,6 +230,27 @@ async def _register_frontend_resources(hass: HomeAssistant) -> None:
 
 async def _register_services(hass: HomeAssistant) -> None:
     """Register integration services."""
+    if hass.services.has_service(DOMAIN, "refresh_data"):
+        return
+    
+    scheduler = hass.data.setdefault(DATA_REFRESH_SCHEDULER, RefreshScheduler())
+    
+    def refresh_target(
+        entry_id: str,
+    ) -> tuple[str, NetworkNestDataUpdateCoordinator, tuple[str, ...]]:
+        """Return the scheduler target for an entry, rate limited per API key."""
+        entry = hass.config_entries.async_get_entry(entry_id)
+        # Options override the data, as in _create_api
+        config = {**entry.data, **entry.options}
+        rate_keys = tuple(
+            key
+            for key in (
+                config.get(CONF_API_KEY),
+                *(site.get(CONF_API_KEY) for site in config.get(CONF_SITES) or []),
+            )
+            if key
+        )
+        return entry_id, hass.data[DOMAIN][entry_id], rate_keys or (config.get(CONF_HOST) or entry_id,)
     
     async def refresh_data_service(call: ServiceCall) -> None:
         """Handle refresh data service call."""
@@ -101,15 +258,21 @@ async def _register_services(hass: HomeAssistant) -> None:
         
         if config_entry_id:
             # Refresh specific entry
-            if config_entry_id in hass.data[DOMAIN]:
-                coordinator = hass.data[DOMAIN][config_entry_id]
-                await coordinator.async_request_refresh()
-            else:
+            if config_entry_id not in hass.data[DOMAIN]:
                 raise HomeAssistantError(f"Configuration entry {config_entry_id} not found")
+            targets = [refresh_target(config_entry_id)]
         else:
-            # Refresh all entries
-            for coordinator in hass.data[DOMAIN].values():
-                await coordinator.async_request_refresh()
+            # Refresh all entries concurrently
+            targets = [refresh_target(entry_id) for entry_id in hass.data[DOMAIN]]
+        
+        for _, coordinator, _ in targets:
+            coordinator.request_device_refresh()
+        result = await scheduler.async_refresh_many(targets)
+        _LOGGER.debug(
+            "Refreshed %d entries in %.2fs, %d requests coalesced",
+            result["entries"], result["duration"], result["coalesced"],
+        )
+        hass.bus.async_fire(EVENT_REFRESH_COMPLETED, result)
     
     async def update_device_service(call: ServiceCall) -> None:
         """Handle update device service call."""
@@ -123,16 +286,66 @@ async def _register_services(hass: HomeAssistant) -> None:
         _LOGGER.info("Updating device %s: name=%s, type=%s", device_id, name, device_type)
         
         # Update device information in all coordinators
-        for coordinator in hass.data[DOMAIN].values():
-            if coordinator.data and "devices" in coordinator.data:
-                for device in coordinator.data["devices"]:
-                    if device.get("id") == device_id:
-                        if name:
-                            device["name"] = name
-                        if device_type:
-                            device["type"] = device_type
-                        await coordinator.async_request_refresh()
-                        break
+        for entry_id, coordinator in hass.data[DOMAIN].items():
+            if device := coordinator.get_device(device_id):
+                if name:
+                    device["name"] = name
+                if device_type:
+                    device["type"] = device_type
+                coordinator.request_device_refresh()
+                await scheduler.async_refresh(*refresh_target(entry_id))
+    
+    async def profile_service(call: ServiceCall) -> None:
+        """Handle profile service call."""
+        cycles = call.data.get("cycles")
+        # With cycles the duration is only an upper bound on how long they may take
+        default_duration = PROFILE_MAX_DURATION if cycles else PROFILE_DEFAULT_DURATION
+        duration = call.data.get("duration", default_duration)
+        output_format = call.data["format"]
+        lag_threshold = call.data["lag_threshold"] / 1000
+        
+        if hass.data.get(DATA_PROFILING):
+            raise HomeAssistantError("A NetworkNest profile is already running")
+        
+        hass.data[DATA_PROFILING] = True
+        try:
+            profiler = NetworkNestProfiler(hass, output_format, lag_threshold)
+            paths = await profiler.async_run(
+                list(hass.data[DOMAIN].values()), duration, cycles
+            )
+        finally:
+            hass.data[DATA_PROFILING] = False
+        
+        _LOGGER.info("NetworkNest profile written to %s", ", ".join(paths))
+    
+    async def export_samples_service(call: ServiceCall) -> None:
+        """Handle export samples service call."""
+        end = _parse_time(call.data.get("end"), time.time())
+        start = _parse_time(call.data.get("start"), end - 86400)
+        device_id = call.data.get("device_id")
+        metric = call.data.get("metric")
+        path = hass.config.path(
+            f"networknest_samples_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        )
+        
+        def export() -> int:
+            rows = 0
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["time", "config_entry_id", "device_id", "metric", "value"])
+                for entry_id, sample_log in _sample_logs(hass, call.data.get("config_entry_id")):
+                    for timestamp, sample_device, sample_metric, value in sample_log.query(
+                        start, end, device_id, metric
+                    ):
+                        writer.writerow([
+                            datetime.fromtimestamp(timestamp).astimezone().isoformat(),
+                            entry_id, sample_device, sample_metric, value,
+                        ])
+                        rows += 1
+            return rows
+        
+        rows = await hass.async_add_executor_job(export)
+        _LOGGER.info("Exported %d NetworkNest samples to %s", rows, path)
     
     hass.services.async_register(
         DOMAIN,
@@ -145,6 +358,101 @@ async def _register_services(hass: HomeAssistant) -> None:
         "update_device",
         update_device_service,
     )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "profile",
+        profile_service,
+        schema=PROFILE_SCHEMA,
+    )
+    
+    hass.services.async_register(
+        DOMAIN,
+        "export_samples",
+        export_samples_service,
+        schema=EXPORT_SAMPLES_SCHEMA,
+    )
+
+
+def _register_websocket_commands(hass: HomeAssistant) -> None:
+    """Register websocket commands; they cannot be removed, so only once."""
+    if hass.data.get(DATA_WEBSOCKET_REGISTERED):
+        return
+    hass.data[DATA_WEBSOCKET_REGISTERED] = True
+    
+    websocket_api.async_register_command(hass, websocket_samples)
+
+
+def _parse_time(value: Any, default: float) -> float:
+    """Return a timestamp from epoch seconds or a date/time string."""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float(value)
+    parsed = dt_util.parse_datetime(str(value))
+    if parsed is None:
+        raise HomeAssistantError(f"Invalid date/time {value}")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE)
+    return parsed.timestamp()
+
+
+def _sample_logs(hass: HomeAssistant, config_entry_id: str | None) -> list[tuple[str, SampleLog]]:
+    """Return the sample logs of one or all entries."""
+    coordinators = hass.data.get(DOMAIN, {})
+    if config_entry_id:
+        if config_entry_id not in coordinators:
+            raise HomeAssistantError(f"Configuration entry {config_entry_id} not found")
+        return [(config_entry_id, coordinators[config_entry_id].sample_log)]
+    return [(entry_id, coordinator.sample_log) for entry_id, coordinator in coordinators.items()]
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/samples",
+        vol.Optional("config_entry_id"): str,
+        vol.Required("start"): vol.Any(vol.Coerce(float), str),
+        vol.Optional("end"): vol.Any(vol.Coerce(float), str),
+        vol.Optional("device_id"): str,
+        vol.Optional("metric"): vol.In(list(METRICS)),
+        vol.Optional("limit", default=SAMPLE_QUERY_LIMIT): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=SAMPLE_QUERY_LIMIT)
+        ),
+    }
+)
+@websocket_api.async_response
+async def websocket_samples(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return logged samples in a time range."""
+    try:
+        end = _parse_time(msg.get("end"), time.time())
+        start = _parse_time(msg["start"], end)
+        sample_logs = _sample_logs(hass, msg.get("config_entry_id"))
+    except HomeAssistantError as exc:
+        connection.send_error(msg["id"], "invalid_request", str(exc))
+        return
+    
+    def query() -> list[list[Any]]:
+        samples = []
+        for entry_id, sample_log in sample_logs:
+            for timestamp, device_id, metric, value in sample_log.query(
+                start, end, msg.get("device_id"), msg.get("metric"), msg["limit"] - len(samples)
+            ):
+                samples.append([timestamp, entry_id, device_id, metric, value])
+            if len(samples) >= msg["limit"]:
+                break
+        return samples
+    
+    samples = await hass.async_add_executor_job(query)
+    connection.send_result(
+        msg["id"],
+        {
+            "columns": ["time", "config_entry_id", "device_id", "metric", "value"],
+            "samples": samples,
+            "truncated": len(samples) >= msg["limit"],
+        },
+    )
 
 
 async def _setup_dashboard_config(hass: HomeAssistant, entry: ConfigEntry) -> None:
@@ -270,17 +578,63 @@ resources:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        scheduler = hass.data.get(DATA_REFRESH_SCHEDULER)
+        if scheduler:
+            scheduler.cancel(entry.entry_id)
+        # Stop the timed refresh before closing; a closed client cannot reopen
+        await coordinator.async_shutdown()
+        await coordinator.api.close()
+        
+        # Remove services with the last entry so they are not left pointing at nothing
+        if not hass.data[DOMAIN]:
+            for service in SERVICES:
+                hass.services.async_remove(DOMAIN, service)
+            if scheduler := hass.data.pop(DATA_REFRESH_SCHEDULER, None):
+                scheduler.cancel()
     
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the sample history of a removed entry."""
+    path = _sample_dir(hass, entry)
+    await hass.async_add_executor_job(shutil.rmtree, path, True)
+    _LOGGER.info("Removed NetworkNest samples at %s", path)
+
+
+def _sample_dir(hass: HomeAssistant, entry: ConfigEntry) -> str:
+    """Return the directory holding an entry's sample log."""
+    return hass.config.path(DOMAIN, "samples", entry.entry_id)
+
+
 class NetworkNestDataUpdateCoordinator(DataUpdateCoordinator):
-    """Class to manage fetching data from the NetworkNest API."""
+    """Class to manage fetching data from the NetworkNest API.
+
+    The network summary is fetched every UPDATE_INTERVAL seconds. Per-device
+    details are fetched with it only every DEVICE_UPDATE_INTERVAL seconds,
+    or on the next refresh after request_device_refresh is called.
+
+    Subnet scans run in the background; a device refresh merges the hosts
+    found by the last finished scan and starts the next one.
+    """
 
-    def __init__(self, hass: HomeAssistant, api: NetworkNestAPI) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        api: NetworkNestClient,
+        scanner: SubnetScanner | None = None,
+        sample_log: SampleLog | None = None,
+    ) -> None:
         """Initialize."""
         self.api = api
+        self.scanner = scanner
+        self.sample_log = sample_log
+        self.device_index: dict[str, dict[str, Any]] = {}
+        self.devices_updated = False
+        self._next_device_update = 0.0
+        self._scanned: list[dict[str, Any]] = []
+        self._scan_task: asyncio.Task | None = None
         super().__init__(
             hass,
             _LOGGER,
@@ -288,13 +642,87 @@ class NetworkNestDataUpdateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=UPDATE_INTERVAL),
         )
 
+    def request_device_refresh(self) -> None:
+        """Fetch per-device details on the next refresh."""
+        self._next_device_update = 0.0
+
     async def _async_update_data(self):
         """Update data via library."""
-        _LOGGER.debug("Fetching data from NetworkNest API...")
+        fetch_devices = self.data is None or time.monotonic() >= self._next_device_update
+        _LOGGER.debug(
+            "Fetching %s from NetworkNest API...",
+            "summary and devices" if fetch_devices else "summary",
+        )
         try:
-            data = await self.api.async_get_states()
+            data = dict(self.data or {})
+            if fetch_devices:
+                self._start_scan()
+                summary, devices = await asyncio.gather(
+                    self.api.async_get_summary(),
+                    self.api.async_get_devices(),
+                )
+                data.update(devices)
+                self._merge_scanned(data, self._scanned)
+                self.device_index = {
+                    device["id"]: device
+                    for device in data.get("devices") or []
+                    if isinstance(device, dict) and "id" in device
+                }
+                self._next_device_update = time.monotonic() + DEVICE_UPDATE_INTERVAL
+            else:
+                summary = await self.api.async_get_summary()
+            # Devices in a summary are only those cached by the client
+            summary.pop("devices", None)
+            data.update(summary)
+            self.devices_updated = fetch_devices
             _LOGGER.debug("Successfully fetched data: %s", data)
-            return data
         except Exception as exc:
             _LOGGER.error("Failed to fetch data from NetworkNest API: %s", exc, exc_info=True)
-            raise
\ No newline at end of file
+            raise
+        
+        if self.sample_log:
+            try:
+                await self.hass.async_add_executor_job(
+                    self.sample_log.append, time.time(), samples_from_data(data, fetch_devices)
+                )
+            except OSError as exc:
+                _LOGGER.warning("Failed to write NetworkNest samples: %s", exc)
+        return data
+
+    def _start_scan(self) -> None:
+        """Start a subnet scan unless one is running."""
+        if not self.scanner or (self._scan_task and not self._scan_task.done()):
+            return
+        self._scan_task = self.hass.async_create_background_task(
+            self._async_scan(), f"{DOMAIN} subnet scan"
+        )
+
+    async def _async_scan(self) -> None:
+        """Scan the subnets and fetch devices again if the hosts changed."""
+        try:
+            scanned = await self.scanner.async_scan()
+        except Exception as exc:  # pylint: disable=broad-except
+            _LOGGER.warning("Subnet scan failed: %s", exc)
+            return
+        if scanned != self._scanned:
+            self._scanned = scanned
+            self.request_device_refresh()
+
+    async def async_shutdown(self) -> None:
+        """Cancel a running subnet scan when the entry is unloaded."""
+        await super().async_shutdown()
+        if self._scan_task:
+            self._scan_task.cancel()
+
+    @staticmethod
+    def _merge_scanned(data: dict[str, Any], scanned: list[dict[str, Any]]) -> None:
+        """Add scanned hosts that the API does not already report."""
+        if not scanned:
+            return
+        devices = data["devices"] = list(data.get("devices") or [])
+        known_ips = {device.get("ip") for device in devices if isinstance(device, dict)}
+        devices.extend(device for device in scanned if device["ip"] not in known_ips)
+
+    def get_device(self, device_id: str) -> dict[str, Any] | None:
+        """Return the latest data for a device."""
+        return self.device_index.get(device_id)
@@ -13,19 +13,36 @@ _LOGGER = logging.getLogger(__name__)
 class NetworkNestAPI:
     """NetworkNest API client."""
 
-    def __init__(self, api_key: str, base_url: str) -> None:
-        """Initialize the API client."""
+    def __init__(
+        self,
+        api_key: str,
+        base_url: str,
+        session: aiohttp.ClientSession | None = None,
+    ) -> None:
+        """Initialize the API client.
+
+        When a session is passed in it is shared with other clients and is
+        not closed by this client.
+        """
         self.api_key = api_key
         self.base_url = base_url.rstrip("/")
-        self.session = None
+        self.session = session
+        self._owns_session = session is None
+        self._closed = False
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create an aiohttp session."""
+        """Get or create an aiohttp session; a closed client is never reopened."""
+        if self._closed:
+            raise RuntimeError("NetworkNest API client is closed")
         if self.session is None or self.session.closed:
+            if not self._owns_session:
+                raise RuntimeError("Shared NetworkNest session is closed")
             self.session = aiohttp.ClientSession()
         return self.session
 
-    async def _make_request(self, endpoint: str) -> dict[str, Any]:
+    async def _make_request(
+        self, endpoint: str, params: dict[str, str] | None = None
+    ) -> dict[str, Any]:
         """Make a request to the API."""
         session = await self._get_session()
         headers = {"x-api-key": self.api_key}
@@ -34,7 +51,7 @@ class NetworkNestAPI:
         _LOGGER.debug("Making request to %s with headers: %s", url, {k: v[:10] + "..." if k == "x-api-key" else v for k, v in headers.items()})
         
         try:
-            async with session.get(url, headers=headers) as response:
+            async with session.get(url, headers=headers, params=params) as response:
                 _LOGGER.debug("Response status: %s", response.status)
                 response.raise_for_status()
                 data = await response.json()
@@ -55,7 +72,18 @@ class NetworkNestAPI:
         """Get current states."""
         return await self._make_request("homeassistant-states")
 
+    async def async_get_summary(self) -> dict[str, Any]:
+        """Get the network summary without per-device details."""
+        data = await self._make_request("homeassistant-states", {"fields": "summary"})
+        data.pop("devices", None)
+        return data
+
+    async def async_get_devices(self) -> dict[str, Any]:
+        """Get per-device details."""
+        return await self._make_request("homeassistant-states", {"fields": "devices"})
+
     async def close(self) -> None:
-        """Close the session."""
-        if self.session and not self.session.closed:
+        """Close the session for good."""
+        self._closed = True
+        if self._owns_session and self.session and not self.session.closed:
             await self.session.close()
\ No newline at end of file
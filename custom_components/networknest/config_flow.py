@@ -13,7 +13,28 @@ from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
 from .api import NetworkNestAPI
-from .const import DOMAIN, CONF_API_KEY, CONF_BASE_URL, DEFAULT_BASE_URL
+from .const import (
+    DOMAIN,
+    CONF_API_KEY,
+    CONF_BASE_URL,
+    CONF_HOST,
+    CONF_MODE,
+    CONF_PASSWORD,
+    CONF_PORT,
+    CONF_SCAN_SUBNETS,
+    CONF_SITE,
+    CONF_SITE_NAME,
+    CONF_SITES,
+    CONF_USERNAME,
+    CONF_VERIFY_SSL,
+    DEFAULT_BASE_URL,
+    DEFAULT_PORT,
+    DEFAULT_SITE,
+    MODE_CLOUD,
+    MODE_LOCAL,
+)
+from .local import UniFiLocalCollector, UniFiLoginError
+from .scanner import parse_subnets
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,10 +42,73 @@ STEP_USER_DATA_SCHEMA = vol.Schema(
     {
         vol.Required(CONF_API_KEY): str,
         vol.Optional(CONF_BASE_URL, default=DEFAULT_BASE_URL): str,
+        vol.Optional(CONF_SITES, default=""): str,
+        vol.Optional(CONF_SCAN_SUBNETS, default=""): str,
     }
 )
 
 
+
+def local_schema(defaults: dict[str, Any]) -> vol.Schema:
+    """Return the schema for a local controller, pre-filled with defaults."""
+    return vol.Schema(
+        {
+            vol.Required(CONF_HOST, default=defaults.get(CONF_HOST, "")): str,
+            vol.Required(CONF_USERNAME, default=defaults.get(CONF_USERNAME, "")): str,
+            vol.Required(CONF_PASSWORD, default=defaults.get(CONF_PASSWORD, "")): str,
+            vol.Optional(CONF_PORT, default=defaults.get(CONF_PORT, DEFAULT_PORT)): int,
+            vol.Optional(CONF_SITE, default=defaults.get(CONF_SITE, DEFAULT_SITE)): str,
+            vol.Optional(
+                CONF_VERIFY_SSL, default=defaults.get(CONF_VERIFY_SSL, False)
+            ): bool,
+            vol.Optional(
+                CONF_SCAN_SUBNETS, default=format_subnets(defaults.get(CONF_SCAN_SUBNETS, []))
+            ): str,
+        }
+    )
+
+
+def parse_sites(value: str) -> list[dict[str, str]]:
+    """Parse additional sites, one "name,api_key[,base_url]" per line."""
+    sites = []
+    for line in value.splitlines():
+        if not line.strip():
+            continue
+        parts = [part.strip() for part in line.split(",")]
+        if len(parts) not in (2, 3) or not parts[0] or not parts[1]:
+            raise InvalidSites
+        sites.append(
+            {
+                CONF_SITE_NAME: parts[0],
+                CONF_API_KEY: parts[1],
+                CONF_BASE_URL: parts[2] if len(parts) == 3 and parts[2] else DEFAULT_BASE_URL,
+            }
+        )
+    return sites
+
+
+def format_sites(sites: list[dict[str, str]]) -> str:
+    """Format additional sites for display in a form."""
+    return "\n".join(
+        f"{site[CONF_SITE_NAME]},{site[CONF_API_KEY]},{site[CONF_BASE_URL]}"
+        for site in sites
+    )
+
+
+def validate_subnets(data: dict[str, Any]) -> None:
+    """Parse the subnets to scan in place."""
+    try:
+        data[CONF_SCAN_SUBNETS] = parse_subnets(data.get(CONF_SCAN_SUBNETS, ""))
+    except ValueError as exc:
+        _LOGGER.error("Invalid subnets to scan: %s", exc)
+        raise InvalidSubnets from exc
+
+
+def format_subnets(subnets: str | list[str]) -> str:
+    """Format the subnets to scan for display in a form."""
+    return subnets if isinstance(subnets, str) else ", ".join(subnets)
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
     api = NetworkNestAPI(data[CONF_API_KEY], data[CONF_BASE_URL])
@@ -51,6 +135,38 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
     return {"title": "NetworkNest"}
 
 
+async def validate_local_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Validate the user input allows us to log in to the local controller."""
+    collector = UniFiLocalCollector(
+        data[CONF_HOST],
+        data[CONF_USERNAME],
+        data[CONF_PASSWORD],
+        port=data[CONF_PORT],
+        site=data[CONF_SITE],
+        verify_ssl=data[CONF_VERIFY_SSL],
+    )
+    
+    try:
+        _LOGGER.info("Validating local controller connection to %s", data[CONF_HOST])
+        await collector.async_get_discovery()
+        
+    except UniFiLoginError as exc:
+        _LOGGER.error("Controller rejected login during validation: %s", exc)
+        raise InvalidCredentials from exc
+    except aiohttp.ClientResponseError as exc:
+        _LOGGER.error("Controller request failed during validation: %s", exc)
+        if exc.status in (401, 403):
+            raise InvalidCredentials from exc
+        raise CannotConnect from exc
+    except (aiohttp.ClientError, TimeoutError) as exc:
+        _LOGGER.error("Connection error during validation: %s", exc)
+        raise CannotConnect from exc
+    finally:
+        await collector.close()
+    
+    return {"title": f"NetworkNest ({data[CONF_HOST]})"}
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for NetworkNest."""
 
@@ -60,11 +176,23 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=[MODE_CLOUD, MODE_LOCAL])
+
+    async def async_step_cloud(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle setup through the NetworkNest cloud API."""
         errors: dict[str, str] = {}
         
         if user_input is not None:
             try:
+                user_input[CONF_SITES] = parse_sites(user_input.get(CONF_SITES, ""))
+                validate_subnets(user_input)
                 info = await validate_input(self.hass, user_input)
+            except InvalidSites:
+                errors[CONF_SITES] = "invalid_sites"
+            except InvalidSubnets:
+                errors[CONF_SCAN_SUBNETS] = "invalid_subnets"
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -80,7 +208,38 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+            step_id="cloud", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
+        )
+
+    async def async_step_local(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle setup against a UniFi controller on the local network."""
+        errors: dict[str, str] = {}
+        
+        if user_input is not None:
+            try:
+                validate_subnets(user_input)
+                info = await validate_local_input(self.hass, user_input)
+            except InvalidSubnets:
+                errors[CONF_SCAN_SUBNETS] = "invalid_subnets"
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidCredentials:
+                errors["base"] = "invalid_credentials"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                await self.async_set_unique_id(f"{user_input[CONF_HOST]}_{user_input[CONF_SITE]}")
+                self._abort_if_unique_id_configured()
+                
+                return self.async_create_entry(
+                    title=info["title"], data={**user_input, CONF_MODE: MODE_LOCAL}
+                )
+
+        return self.async_show_form(
+            step_id="local", data_schema=local_schema(user_input or {}), errors=errors
         )
 
     @staticmethod
@@ -99,12 +258,21 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        if self.config_entry.data.get(CONF_MODE) == MODE_LOCAL:
+            return await self.async_step_local(user_input)
+        
         errors: dict[str, str] = {}
         
         if user_input is not None:
             try:
                 # Validate the input
+                user_input[CONF_SITES] = parse_sites(user_input.get(CONF_SITES, ""))
+                validate_subnets(user_input)
                 await validate_input(self.hass, user_input)
+            except InvalidSites:
+                errors[CONF_SITES] = "invalid_sites"
+            except InvalidSubnets:
+                errors[CONF_SCAN_SUBNETS] = "invalid_subnets"
             except CannotConnect:
                 errors["base"] = "cannot_connect"
             except InvalidAuth:
@@ -126,6 +294,22 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_BASE_URL,
                     default=self.config_entry.data.get(CONF_BASE_URL, DEFAULT_BASE_URL)
                 ): str,
+                vol.Optional(
+                    CONF_SITES,
+                    default=format_sites(
+                        self.config_entry.options.get(
+                            CONF_SITES, self.config_entry.data.get(CONF_SITES, [])
+                        )
+                    ),
+                ): str,
+                vol.Optional(
+                    CONF_SCAN_SUBNETS,
+                    default=format_subnets(
+                        self.config_entry.options.get(
+                            CONF_SCAN_SUBNETS, self.config_entry.data.get(CONF_SCAN_SUBNETS, [])
+                        )
+                    ),
+                ): str,
             }
         )
         
@@ -133,10 +317,49 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             step_id="init", data_schema=schema, errors=errors
         )
 
+    async def async_step_local(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options of a local controller entry."""
+        errors: dict[str, str] = {}
+        
+        if user_input is not None:
+            try:
+                validate_subnets(user_input)
+                await validate_local_input(self.hass, user_input)
+            except InvalidSubnets:
+                errors[CONF_SCAN_SUBNETS] = "invalid_subnets"
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except InvalidCredentials:
+                errors["base"] = "invalid_credentials"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+        
+        defaults = {**self.config_entry.data, **self.config_entry.options}
+        return self.async_show_form(
+            step_id="local", data_schema=local_schema(defaults), errors=errors
+        )
+
 
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
 
 class InvalidAuth(HomeAssistantError):
-    """Error to indicate there is invalid auth."""
\ No newline at end of file
+    """Error to indicate there is invalid auth."""
+
+
+class InvalidCredentials(HomeAssistantError):
+    """Error to indicate the controller rejected the username or password."""
+
+
+class InvalidSites(HomeAssistantError):
+    """Error to indicate the additional sites list is malformed."""
+
+
+class InvalidSubnets(HomeAssistantError):
+    """Error to indicate the subnets to scan are invalid."""
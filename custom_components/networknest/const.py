@@ -2,11 +2,65 @@
 
 DOMAIN = "networknest"
 DEFAULT_NAME = "NetworkNest"
-UPDATE_INTERVAL = 30  # seconds
+UPDATE_INTERVAL = 10  # seconds, network summary
+DEVICE_UPDATE_INTERVAL = 120  # seconds, per-device details
 
 # Configuration keys
 CONF_API_KEY = "api_key"
 CONF_BASE_URL = "base_url"
+CONF_SITES = "sites"
+CONF_SITE_NAME = "name"
+CONF_MODE = "mode"
+CONF_HOST = "host"
+CONF_PORT = "port"
+CONF_USERNAME = "username"
+CONF_PASSWORD = "password"
+CONF_SITE = "site"
+CONF_VERIFY_SSL = "verify_ssl"
+CONF_SCAN_SUBNETS = "scan_subnets"
+
+# Collection modes
+MODE_CLOUD = "cloud"
+MODE_LOCAL = "local"
 
 # Default values
-DEFAULT_BASE_URL = "https://jwqmtmapnvncrwixouek.supabase.co"
\ No newline at end of file
+DEFAULT_BASE_URL = "https://jwqmtmapnvncrwixouek.supabase.co"
+DEFAULT_PORT = 8443
+DEFAULT_SITE = "default"
+
+# Multi-site polling
+MAX_CONCURRENT_SITES = 10
+SITE_TIMEOUT = 15  # seconds
+
+# Local controller collection
+LOCAL_FULL_SYNC_POLLS = 10  # polls between full client table fetches
+LOCAL_REQUEST_TIMEOUT = 10  # seconds
+
+# Subnet scanning
+SCAN_PORTS = (80, 443, 22, 445)
+SCAN_CONCURRENCY = 256
+SCAN_TIMEOUT = 0.5  # seconds per connection attempt
+SCAN_ALIVE_TTL = 300  # seconds before a live host is probed again
+SCAN_DEAD_TTL = 900  # seconds before a silent host is probed again
+SCAN_MAX_HOSTS = 4096
+
+# Profiling
+PROFILE_FORMAT_PSTATS = "pstats"
+PROFILE_FORMAT_FLAMEGRAPH = "flamegraph"
+PROFILE_DEFAULT_DURATION = 30  # seconds
+PROFILE_MAX_DURATION = 600  # seconds
+PROFILE_MAX_CYCLES = 100
+PROFILE_LAG_THRESHOLD = 0.1  # seconds
+PROFILE_MIN_LAG_THRESHOLD = 0.01  # seconds
+PROFILE_MAX_LAG_THRESHOLD = 5  # seconds
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds
+
+# Manual refresh scheduling
+REFRESH_RATE_LIMIT = 0.2  # refreshes per second per API key
+REFRESH_RATE_BURST = 3
+EVENT_REFRESH_COMPLETED = f"{DOMAIN}_refresh_completed"
+
+# Sample log
+SAMPLE_SEGMENT_SECONDS = 86400  # one segment file per day
+SAMPLE_RETENTION_DAYS = 400
+SAMPLE_QUERY_LIMIT = 50000
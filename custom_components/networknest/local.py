@@ -0,0 +1,318 @@
+"""Local UniFi controller collector for NetworkNest."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any
+
+import aiohttp
+
+from .const import LOCAL_FULL_SYNC_POLLS, LOCAL_REQUEST_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+UNIFI_DEVICE_TYPES = {
+    "uap": "Access Point",
+    "usw": "Switch",
+    "ugw": "Router",
+    "udm": "Router",
+    "uxg": "Router",
+}
+
+# Event key suffixes that change whether a device or client is connected
+ONLINE_EVENT_SUFFIXES = ("_Connected", "_Roam", "_Adopted")
+OFFLINE_EVENT_SUFFIXES = ("_Disconnected", "_Lost_Contact")
+
+
+class UniFiLoginError(aiohttp.ClientResponseError):
+    """The controller rejected the username or password."""
+
+
+def _infer_client_type(client: dict[str, Any]) -> str:
+    """Guess a device type from a UniFi client record."""
+    hostname = (client.get("hostname") or "").lower()
+    oui = (client.get("oui") or "").lower()
+
+    if "iphone" in hostname or "ipad" in hostname or "apple" in oui:
+        return "Tablet" if "ipad" in hostname else "Mobile"
+    if "android" in hostname or "samsung" in oui:
+        return "Mobile"
+    if "tv" in hostname or "roku" in hostname or "chromecast" in hostname:
+        return "Smart TV"
+    if "cam" in hostname or "esp" in hostname or "iot" in hostname:
+        return "IoT Device"
+    return "Computer"
+
+
+def _format_rate(record: dict[str, Any]) -> str:
+    """Format a record's current throughput like the cloud API does."""
+    rate = (record.get("rx_bytes-r") or 0) + (record.get("tx_bytes-r") or 0)
+    return f"{round(rate / 1_000_000, 2)} MB/s"
+
+
+class UniFiLocalCollector:
+    """Collect NetworkNest states directly from a UniFi controller on the LAN.
+
+    Exposes the same interface as NetworkNestAPI. The summary comes from the
+    site health. The client table is fetched in full every
+    LOCAL_FULL_SYNC_POLLS device polls; in between only the controller
+    events since the last poll are read and applied to the cached table.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        username: str,
+        password: str,
+        port: int = 8443,
+        site: str = "default",
+        verify_ssl: bool = False,
+        full_sync_polls: int = LOCAL_FULL_SYNC_POLLS,
+    ) -> None:
+        """Initialize the collector.
+
+        The host may also be a full URL such as http://127.0.0.1:8080.
+        """
+        if "://" in host:
+            self.base_url = host.rstrip("/")
+        else:
+            self.base_url = f"https://{host}:{port}"
+        self.username = username
+        self.password = password
+        self.site = site
+        self.verify_ssl = verify_ssl
+        self.full_sync_polls = full_sync_polls
+        self.session: aiohttp.ClientSession | None = None
+        self._closed = False
+        # UniFi OS consoles serve the network application under a prefix
+        self._prefix = ""
+        self._logged_in = False
+        # Summary and device polls run concurrently; they must share one login
+        self._login_lock = asyncio.Lock()
+        self._logins = 0
+        self._polls_since_sync = 0
+        self._last_event_time = 0
+        # Events at _last_event_time already applied; times are only to the millisecond
+        self._last_event_ids: set[Any] = set()
+        self._devices: dict[str, dict[str, Any]] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get or create a pooled session with its own cookie jar."""
+        if self._closed:
+            raise RuntimeError("UniFi local collector is closed")
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=4, ssl=self.verify_ssl)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                cookie_jar=aiohttp.CookieJar(unsafe=True),
+                timeout=aiohttp.ClientTimeout(total=LOCAL_REQUEST_TIMEOUT),
+            )
+            self._logged_in = False
+        return self.session
+
+    async def _ensure_login(self, expired: int | None = None) -> None:
+        """Log in unless another request already did.
+
+        expired is the login count seen by a request that got a 401; the
+        session is only replaced if no login happened since.
+        """
+        async with self._login_lock:
+            if self._logged_in and self._logins != expired:
+                return
+            await self._login()
+
+    async def _login(self) -> None:
+        """Log in to the controller, detecting UniFi OS consoles."""
+        self._logged_in = False
+        self._logins += 1
+        session = await self._get_session()
+        credentials = {"username": self.username, "password": self.password}
+
+        async with session.post(f"{self.base_url}/api/login", json=credentials) as response:
+            if response.status != 404:
+                self._raise_for_login(response)
+                self._prefix = ""
+                self._logged_in = True
+                return
+
+        async with session.post(
+            f"{self.base_url}/api/auth/login", json=credentials
+        ) as response:
+            self._raise_for_login(response)
+            csrf_token = response.headers.get("x-csrf-token")
+        if csrf_token:
+            session.headers["x-csrf-token"] = csrf_token
+        self._prefix = "/proxy/network"
+        self._logged_in = True
+
+    @staticmethod
+    def _raise_for_login(response: aiohttp.ClientResponse) -> None:
+        """Raise for a failed login; classic controllers answer bad credentials with 400."""
+        if response.status in (400, 401, 403):
+            raise UniFiLoginError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=response.reason or "",
+                headers=response.headers,
+            )
+        response.raise_for_status()
+
+    async def _request(
+        self, method: str, path: str, payload: dict[str, Any] | None = None
+    ) -> list[dict[str, Any]]:
+        """Make a site API request, logging in again once if the session expired."""
+        session = await self._get_session()
+        for attempt in range(2):
+            if not self._logged_in:
+                await self._ensure_login()
+            login = self._logins
+            url = f"{self.base_url}{self._prefix}/api/s/{self.site}/{path}"
+            _LOGGER.debug("Making %s request to %s", method, url)
+            async with session.request(method, url, json=payload) as response:
+                if response.status == 401 and attempt == 0:
+                    _LOGGER.debug("UniFi session expired, logging in again")
+                    await self._ensure_login(expired=login)
+                    continue
+                response.raise_for_status()
+                data = await response.json()
+                return data.get("data", [])
+        return []
+
+    async def _full_sync(self) -> None:
+        """Rebuild the device table from the controller."""
+        infrastructure = await self._request("GET", "stat/device")
+        clients = await self._request("GET", "stat/sta")
+        devices: dict[str, dict[str, Any]] = {}
+
+        for device in infrastructure:
+            mac = device.get("mac")
+            if not mac:
+                continue
+            devices[mac] = {
+                "id": f"unifi_{mac.replace(':', '_')}",
+                "name": device.get("name") or device.get("model") or "UniFi Device",
+                "type": UNIFI_DEVICE_TYPES.get(device.get("type"), "Network"),
+                "ip": device.get("ip"),
+                "mac": mac,
+                "status": "online" if device.get("state") == 1 else "offline",
+                "bandwidth": _format_rate(device),
+            }
+
+        for client in clients:
+            mac = client.get("mac")
+            if not mac:
+                continue
+            devices[mac] = {
+                "id": f"client_{mac.replace(':', '_')}",
+                "name": client.get("name") or client.get("hostname") or f"Device {client.get('ip')}",
+                "type": _infer_client_type(client),
+                "ip": client.get("ip"),
+                "mac": mac,
+                "status": "online",
+                "bandwidth": _format_rate(client),
+            }
+
+        # Clients that left since the last sync are kept but shown offline
+        for mac, device in self._devices.items():
+            if mac not in devices:
+                devices[mac] = {**device, "status": "offline", "bandwidth": "0 MB/s"}
+
+        self._devices = devices
+        self._polls_since_sync = 0
+
+    async def _apply_events(self) -> None:
+        """Apply connect and disconnect events since the last poll."""
+        events = await self._request(
+            "POST", "stat/event", {"within": 1, "_sort": "-time", "_limit": 500}
+        )
+        newest = self._last_event_time
+        newest_ids = set(self._last_event_ids)
+        for event in sorted(events, key=lambda event: event.get("time", 0)):
+            event_time = event.get("time", 0)
+            event_id = event.get("_id") or (event_time, event.get("key"), event.get("user"))
+            if event_time < self._last_event_time or (
+                event_time == self._last_event_time and event_id in self._last_event_ids
+            ):
+                continue
+            if event_time > newest:
+                newest, newest_ids = event_time, set()
+            newest_ids.add(event_id)
+            key = event.get("key", "")
+            mac = event.get("user") or event.get("guest") or event.get("ap") or event.get("sw") or event.get("gw")
+            if not mac:
+                continue
+            if mac not in self._devices:
+                # An unknown client joined; pick it up on the next poll
+                self._polls_since_sync = self.full_sync_polls
+                continue
+            if key.endswith(OFFLINE_EVENT_SUFFIXES):
+                self._devices[mac]["status"] = "offline"
+                self._devices[mac]["bandwidth"] = "0 MB/s"
+            elif key.endswith(ONLINE_EVENT_SUFFIXES):
+                self._devices[mac]["status"] = "online"
+        self._last_event_time = newest
+        self._last_event_ids = newest_ids
+
+    async def async_get_discovery(self) -> dict[str, Any]:
+        """Get controller information."""
+        sysinfo = await self._request("GET", "stat/sysinfo")
+        return {
+            "controller": self.base_url,
+            "site": self.site,
+            "sysinfo": sysinfo[0] if sysinfo else {},
+        }
+
+    async def async_get_states(self) -> dict[str, Any]:
+        """Get current states in the same shape as the cloud API."""
+        summary = await self.async_get_summary()
+        return {**summary, **await self.async_get_devices()}
+
+    async def async_get_summary(self) -> dict[str, Any]:
+        """Get the network summary from the site health."""
+        health = await self._request("GET", "stat/health")
+        wan = next((item for item in health if item.get("subsystem") == "wan"), {})
+        down = (wan.get("rx_bytes-r") or 0) * 8 / 1_000_000
+        up = (wan.get("tx_bytes-r") or 0) * 8 / 1_000_000
+        uptime = (wan.get("gw_system-stats") or {}).get("uptime")
+        users = [
+            item["num_user"] for item in health
+            if item.get("subsystem") in ("lan", "wlan") and "num_user" in item
+        ]
+
+        return {
+            "bandwidth": round(down + up, 2),
+            "bandwidth_down": round(down, 2),
+            "bandwidth_up": round(up, 2),
+            "connected_devices": sum(users) if users else self._online_count(),
+            "network_status": "online" if wan.get("status", "ok") == "ok" else "offline",
+            "uptime": round(int(uptime) / 3600, 2) if uptime else 0,
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def async_get_devices(self) -> dict[str, Any]:
+        """Get per-device details, incrementally between full syncs."""
+        if not self._devices or self._polls_since_sync >= self.full_sync_polls:
+            if not self._last_event_time:
+                # Events older than the first snapshot are already reflected in it
+                self._last_event_time = int(datetime.now(timezone.utc).timestamp() * 1000)
+            await self._full_sync()
+        else:
+            await self._apply_events()
+            self._polls_since_sync += 1
+
+        return {
+            "connected_devices": self._online_count(),
+            "devices": list(self._devices.values()),
+        }
+
+    def _online_count(self) -> int:
+        """Return how many known devices are online."""
+        return sum(1 for device in self._devices.values() if device["status"] == "online")
+
+    async def close(self) -> None:
+        """Close the session for good."""
+        self._closed = True
+        if self.session and not self.session.closed:
+            await self.session.close()
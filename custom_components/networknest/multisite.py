@@ -0,0 +1,238 @@
+"""Multi-site polling for NetworkNest."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any
+
+import aiohttp
+
+from .api import NetworkNestAPI
+from .const import (
+    CONF_API_KEY,
+    CONF_BASE_URL,
+    CONF_SITE_NAME,
+    DEFAULT_BASE_URL,
+    MAX_CONCURRENT_SITES,
+    SITE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SUMMED_KEYS = ("bandwidth", "bandwidth_down", "bandwidth_up", "connected_devices")
+
+
+def site_id_for(api_key: str, base_url: str) -> str:
+    """Return a stable identifier for a site.
+
+    Site names can be edited in the options, so the identifier, which ends
+    up in device unique IDs and sample history, is derived from the site's
+    API key and base URL instead.
+    """
+    digest = hashlib.blake2b(
+        f"{base_url.rstrip('/')}|{api_key}".encode(), digest_size=6
+    ).hexdigest()
+    return f"site_{digest}"
+
+
+class NetworkNestMultiSiteAPI:
+    """Poll several NetworkNest sites concurrently and merge their states.
+
+    All sites share one aiohttp session whose connector is capped at the
+    concurrency limit, so adding a site adds a request, not a session.
+
+    The first site is the entry's own site. Its device IDs are left as the
+    API reports them, so adding sites to a single-site entry keeps its
+    existing entities and sample history; devices of the other sites are
+    prefixed with their site ID.
+    """
+
+    def __init__(
+        self,
+        sites: list[dict[str, str]],
+        max_concurrency: int = MAX_CONCURRENT_SITES,
+        timeout: float = SITE_TIMEOUT,
+    ) -> None:
+        """Initialize the multi-site client."""
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.session: aiohttp.ClientSession | None = None
+        self._closed = False
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.sites: dict[str, dict[str, Any]] = {}
+        for site in sites:
+            base_url = site.get(CONF_BASE_URL) or DEFAULT_BASE_URL
+            site_id = base_id = site_id_for(site[CONF_API_KEY], base_url)
+            suffix = 1
+            while site_id in self.sites:
+                suffix += 1
+                site_id = f"{base_id}_{suffix}"
+            self.sites[site_id] = {
+                "name": site[CONF_SITE_NAME],
+                "api_key": site[CONF_API_KEY],
+                "base_url": base_url,
+                "api": None,
+            }
+        self.primary_site = next(iter(self.sites), None)
+        # Last good payload per site, kept so a failing site does not drop
+        # its devices from the merged view.
+        self._last_data: dict[str, dict[str, Any]] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get or create the session shared by all sites."""
+        if self._closed:
+            raise RuntimeError("NetworkNest multi-site client is closed")
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(connector=connector)
+            for site in self.sites.values():
+                site["api"] = NetworkNestAPI(
+                    site["api_key"], site["base_url"], session=self.session
+                )
+        return self.session
+
+    async def _fetch_site(self, site_id: str, method: str) -> tuple[str, Any, float]:
+        """Fetch one site under the concurrency limit and per-site timeout."""
+        api: NetworkNestAPI = self.sites[site_id]["api"]
+        async with self._semaphore:
+            start = time.monotonic()
+            try:
+                result = await asyncio.wait_for(
+                    getattr(api, method)(), timeout=self.timeout
+                )
+            except Exception as exc:  # pylint: disable=broad-except
+                return site_id, exc, time.monotonic() - start
+            return site_id, result, time.monotonic() - start
+
+    async def _fetch_all(self, method: str) -> list[tuple[str, Any, float]]:
+        """Fetch every site concurrently."""
+        await self._get_session()
+        return await asyncio.gather(
+            *(self._fetch_site(site_id, method) for site_id in self.sites)
+        )
+
+    async def async_get_discovery(self) -> dict[str, Any]:
+        """Get discovery information for every site."""
+        results = await self._fetch_all("async_get_discovery")
+        discovery: dict[str, Any] = {}
+        for site_id, result, _ in results:
+            if isinstance(result, Exception):
+                _LOGGER.warning(
+                    "Discovery failed for site %s: %s", self.sites[site_id]["name"], result
+                )
+                continue
+            discovery[site_id] = result
+        if not discovery:
+            raise aiohttp.ClientError("Discovery failed for all NetworkNest sites")
+        return {"sites": discovery}
+
+    async def async_get_states(self) -> dict[str, Any]:
+        """Get current states for every site, merged into one view."""
+        return await self._async_get("async_get_states")
+
+    async def async_get_summary(self) -> dict[str, Any]:
+        """Get the network summary for every site, merged into one view."""
+        return await self._async_get("async_get_summary")
+
+    async def async_get_devices(self) -> dict[str, Any]:
+        """Get per-device details for every site, merged into one view."""
+        return await self._async_get("async_get_devices")
+
+    async def _async_get(self, method: str) -> dict[str, Any]:
+        """Fetch every site and merge the results with earlier fetches."""
+        results = await self._fetch_all(method)
+        site_status: dict[str, dict[str, Any]] = {}
+        errors = []
+
+        for site_id, result, elapsed in results:
+            name = self.sites[site_id]["name"]
+            if isinstance(result, Exception):
+                error = str(result) or type(result).__name__
+                _LOGGER.warning("Failed to fetch site %s: %s", name, error)
+                errors.append(f"{name}: {error}")
+                site_status[site_id] = {
+                    "name": name,
+                    "available": False,
+                    "error": error,
+                    "latency": round(elapsed, 3),
+                }
+                continue
+            data = self._last_data[site_id] = {**self._last_data.get(site_id, {}), **result}
+            site_status[site_id] = {
+                "name": name,
+                "available": True,
+                "network_status": data.get("network_status"),
+                "connected_devices": data.get("connected_devices"),
+                "bandwidth": data.get("bandwidth"),
+                "latency": round(elapsed, 3),
+            }
+
+        if len(errors) == len(self.sites):
+            raise aiohttp.ClientError(
+                f"All {len(errors)} NetworkNest sites failed: {'; '.join(errors)}"
+            )
+
+        # The summary is polled often and its caller drops devices, so skip them
+        return self._merge(site_status, with_devices=method != "async_get_summary")
+
+    def _merge(
+        self, site_status: dict[str, dict[str, Any]], with_devices: bool = True
+    ) -> dict[str, Any]:
+        """Merge per-site payloads into a single states payload."""
+        merged: dict[str, Any] = {"sites": site_status}
+        if with_devices:
+            merged["devices"] = []
+        statuses = []
+        uptimes = []
+        last_updated = []
+
+        for site_id, data in self._last_data.items():
+            available = site_status[site_id]["available"]
+            for key in SUMMED_KEYS:
+                if available and isinstance(data.get(key), (int, float)):
+                    merged[key] = merged.get(key, 0) + data[key]
+            if available:
+                statuses.append(data.get("network_status"))
+                if isinstance(data.get("uptime"), (int, float)):
+                    uptimes.append(data["uptime"])
+                if data.get("last_updated"):
+                    last_updated.append(data["last_updated"])
+
+            if not with_devices:
+                continue
+            for device in data.get("devices") or []:
+                if not isinstance(device, dict) or "id" not in device:
+                    continue
+                device_id = device["id"]
+                if site_id != self.primary_site:
+                    device_id = f"{site_id}_{device_id}"
+                merged["devices"].append(
+                    {
+                        **device,
+                        "id": device_id,
+                        "site": site_id,
+                        "site_name": self.sites[site_id]["name"],
+                        "site_available": available,
+                    }
+                )
+
+        online = sum(1 for status in statuses if status == "online")
+        if online == len(self.sites):
+            merged["network_status"] = "online"
+        elif online:
+            merged["network_status"] = "degraded"
+        else:
+            merged["network_status"] = "offline"
+        if uptimes:
+            merged["uptime"] = min(uptimes)
+        if last_updated:
+            merged["last_updated"] = max(last_updated)
+        return merged
+
+    async def close(self) -> None:
+        """Close the shared session for good."""
+        self._closed = True
+        if self.session and not self.session.closed:
+            await self.session.close()
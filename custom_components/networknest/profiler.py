@@ -0,0 +1,182 @@
+"""On-demand profiler for the NetworkNest integration."""
+from __future__ import annotations
+
+import asyncio
+import cProfile
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    PROFILE_FORMAT_FLAMEGRAPH,
+    PROFILE_FORMAT_PSTATS,
+    PROFILE_LAG_THRESHOLD,
+    PROFILE_SAMPLE_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+INTEGRATION_DIR = os.path.dirname(__file__)
+
+
+def _frame_label(frame: Any) -> str:
+    """Return a flamegraph label for a frame."""
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class NetworkNestProfiler:
+    """Profile the event loop while NetworkNest refreshes.
+
+    Nothing runs until async_run is called: the sampling thread and the
+    loop heartbeat only exist for the duration of a profile.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        output_format: str = PROFILE_FORMAT_PSTATS,
+        lag_threshold: float = PROFILE_LAG_THRESHOLD,
+        sample_interval: float = PROFILE_SAMPLE_INTERVAL,
+    ) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self.output_format = output_format
+        self.lag_threshold = lag_threshold
+        self.sample_interval = sample_interval
+        self.samples: Counter[str] = Counter()
+        self.lag_events: list[dict[str, Any]] = []
+        self._loop_thread_id = 0
+        self._heartbeat = 0.0
+        self._heartbeat_handle: asyncio.TimerHandle | None = None
+        self._stop = threading.Event()
+
+    def _beat(self) -> None:
+        """Record that the event loop is responsive."""
+        self._heartbeat = time.monotonic()
+        self._heartbeat_handle = self.hass.loop.call_later(
+            self.lag_threshold / 4, self._beat
+        )
+
+    def _sample_loop(self) -> None:
+        """Sample the event loop thread until stopped."""
+        stalled_since = 0.0
+        while not self._stop.wait(self.sample_interval):
+            frame = sys._current_frames().get(self._loop_thread_id)  # pylint: disable=protected-access
+            if frame is None:
+                continue
+
+            if self.output_format == PROFILE_FORMAT_FLAMEGRAPH:
+                labels = []
+                current = frame
+                while current is not None:
+                    labels.append(_frame_label(current))
+                    current = current.f_back
+                self.samples[";".join(reversed(labels))] += 1
+
+            lag = time.monotonic() - self._heartbeat
+            if lag < self.lag_threshold:
+                stalled_since = 0.0
+                continue
+            if stalled_since == self._heartbeat:
+                # Still the stall captured earlier; extend its duration
+                self.lag_events[-1]["lag"] = lag
+                continue
+            stalled_since = self._heartbeat
+            stack = traceback.extract_stack(frame)
+            self.lag_events.append(
+                {
+                    "lag": lag,
+                    "networknest": any(
+                        entry.filename.startswith(INTEGRATION_DIR) for entry in stack
+                    ),
+                    "stack": "".join(traceback.format_list(stack)),
+                }
+            )
+
+    async def async_run(
+        self,
+        coordinators: list[Any],
+        duration: float,
+        cycles: int | None = None,
+    ) -> list[str]:
+        """Profile for a duration, or for a number of refresh cycles.
+
+        With cycles set, the duration bounds how long the cycles may take so
+        a hung refresh cannot keep the profile running.
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._beat()
+        sampler = threading.Thread(
+            target=self._sample_loop, name="networknest_profiler", daemon=True
+        )
+        profile = cProfile.Profile() if self.output_format == PROFILE_FORMAT_PSTATS else None
+
+        sampler.start()
+        if profile:
+            profile.enable()
+        start = time.monotonic()
+        completed = 0
+        try:
+            if cycles:
+                async with asyncio.timeout(duration):
+                    for completed in range(cycles):
+                        await asyncio.gather(
+                            *(coordinator.async_refresh() for coordinator in coordinators)
+                        )
+                    completed = cycles
+            else:
+                await asyncio.sleep(duration)
+        except TimeoutError:
+            _LOGGER.warning(
+                "Stopped profiling after %.1fs with %d of %d refresh cycles done",
+                duration, completed, cycles,
+            )
+        finally:
+            if profile:
+                profile.disable()
+            self._stop.set()
+            if self._heartbeat_handle:
+                self._heartbeat_handle.cancel()
+            await self.hass.async_add_executor_job(sampler.join)
+
+        _LOGGER.info(
+            "Profiled NetworkNest for %.1fs, %d event loop stalls over %.0fms",
+            time.monotonic() - start, len(self.lag_events), self.lag_threshold * 1000,
+        )
+        return await self.hass.async_add_executor_job(self._write, profile)
+
+    def _write(self, profile: cProfile.Profile | None) -> list[str]:
+        """Write the profile and the lag report to the config directory."""
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = self.hass.config.path(f"networknest_profile_{stamp}")
+        paths = []
+
+        if profile:
+            profile.dump_stats(f"{base}.prof")
+            paths.append(f"{base}.prof")
+        else:
+            with open(f"{base}.folded", "w", encoding="utf-8") as folded:
+                for stack, count in self.samples.most_common():
+                    folded.write(f"{stack} {count}\n")
+            paths.append(f"{base}.folded")
+
+        if self.lag_events:
+            with open(f"{base}_lag.txt", "w", encoding="utf-8") as report:
+                for event in sorted(self.lag_events, key=lambda event: -event["lag"]):
+                    owner = "NetworkNest" if event["networknest"] else "other"
+                    report.write(f"# {event['lag'] * 1000:.0f}ms stall ({owner})\n")
+                    report.write(event["stack"])
+                    report.write("\n")
+            paths.append(f"{base}_lag.txt")
+
+        return paths
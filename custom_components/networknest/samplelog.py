@@ -0,0 +1,257 @@
+"""Append-only on-disk sample log for NetworkNest."""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+from .const import SAMPLE_RETENTION_DAYS, SAMPLE_SEGMENT_SECONDS
+
+_LOGGER = logging.getLogger(__name__)
+
+# timestamp, device hash, metric id, value
+RECORD = struct.Struct("<dQHd")
+SEGMENT_SUFFIX = ".seg"
+DEVICES_FILE = "devices.json"
+NETWORK_DEVICE = "network"
+
+METRICS = {
+    "bandwidth": 0,
+    "bandwidth_down": 1,
+    "bandwidth_up": 2,
+    "connected_devices": 3,
+    "uptime": 4,
+    "status": 5,
+}
+METRIC_NAMES = {metric_id: name for name, metric_id in METRICS.items()}
+NETWORK_METRICS = ("bandwidth", "bandwidth_down", "bandwidth_up", "connected_devices", "uptime")
+
+
+def device_hash(device_id: str) -> int:
+    """Return the stable 64-bit key a device is stored under."""
+    return int.from_bytes(
+        hashlib.blake2b(device_id.encode(), digest_size=8).digest(), "little"
+    )
+
+
+def _number(value: Any) -> float | None:
+    """Return a sample value, parsing strings like "12.5 MB/s"."""
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.split()[0])
+        except (IndexError, ValueError):
+            return None
+    return None
+
+
+def samples_from_data(data: dict[str, Any], with_devices: bool) -> list[tuple[str, str, float]]:
+    """Extract (device id, metric, value) samples from coordinator data."""
+    samples = []
+    for metric in NETWORK_METRICS:
+        if (value := _number(data.get(metric))) is not None:
+            samples.append((NETWORK_DEVICE, metric, value))
+    if "network_status" in data:
+        samples.append((NETWORK_DEVICE, "status", float(data["network_status"] == "online")))
+
+    if with_devices:
+        for device in data.get("devices") or []:
+            if not isinstance(device, dict) or "id" not in device:
+                continue
+            samples.append((device["id"], "status", float(device.get("status") == "online")))
+            if (value := _number(device.get("bandwidth"))) is not None:
+                samples.append((device["id"], "bandwidth", value))
+    return samples
+
+
+class SampleLog:
+    """Fixed-width binary sample segments with memory-mapped range queries.
+
+    Each segment file covers SAMPLE_SEGMENT_SECONDS and is named after its
+    start time. Records are appended in time order, so a segment is its own
+    time index: range bounds are found by binary search over the mapped
+    records. All methods block and belong in the executor; appends are
+    serialized, since timed and manual refreshes can overlap.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_seconds: int = SAMPLE_SEGMENT_SECONDS,
+        retention_days: int = SAMPLE_RETENTION_DAYS,
+    ) -> None:
+        """Initialize the log."""
+        self.directory = directory
+        self.segment_seconds = segment_seconds
+        self.retention_days = retention_days
+        self._devices: dict[int, str] | None = None
+        self._current_segment = 0
+        self._last_timestamp = 0.0
+        self._lock = threading.Lock()
+
+    def _load_devices(self) -> dict[int, str]:
+        """Load the device hash to id map."""
+        if self._devices is None:
+            try:
+                with open(os.path.join(self.directory, DEVICES_FILE), encoding="utf-8") as file:
+                    self._devices = {int(key): value for key, value in json.load(file).items()}
+            except (OSError, ValueError):
+                self._devices = {}
+        return self._devices
+
+    def _segments(self) -> list[int]:
+        """Return the start times of all segments, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(
+            int(name[: -len(SEGMENT_SUFFIX)])
+            for name in names
+            if name.endswith(SEGMENT_SUFFIX) and name[: -len(SEGMENT_SUFFIX)].isdigit()
+        )
+
+    def _segment_path(self, start: int) -> str:
+        """Return the path of a segment."""
+        return os.path.join(self.directory, f"{start}{SEGMENT_SUFFIX}")
+
+    def append(self, timestamp: float, samples: list[tuple[str, str, float]]) -> None:
+        """Append samples taken at a timestamp."""
+        if not samples:
+            return
+        with self._lock:
+            self._append(timestamp, samples)
+
+    def _append(self, timestamp: float, samples: list[tuple[str, str, float]]) -> None:
+        """Append samples; the caller holds the lock."""
+        # Overlapping refreshes can arrive out of order; segments must stay sorted
+        timestamp = self._last_timestamp = max(timestamp, self._last_timestamp)
+        os.makedirs(self.directory, exist_ok=True)
+        devices = self._load_devices()
+        new_devices = False
+        records = []
+        for device_id, metric, value in samples:
+            key = device_hash(device_id)
+            if key not in devices:
+                devices[key] = device_id
+                new_devices = True
+            records.append(RECORD.pack(timestamp, key, METRICS[metric], value))
+
+        segment = int(timestamp // self.segment_seconds) * self.segment_seconds
+        with open(self._segment_path(segment), "ab") as file:
+            # Drop a partial record left by a crash so appends stay aligned
+            size = file.seek(0, os.SEEK_END)
+            if partial := size % RECORD.size:
+                _LOGGER.warning(
+                    "Dropping %d bytes of a partial record from sample segment %s",
+                    partial, segment,
+                )
+                file.truncate(size - partial)
+            file.write(b"".join(records))
+
+        if new_devices:
+            path = os.path.join(self.directory, DEVICES_FILE)
+            with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+                json.dump({str(key): value for key, value in devices.items()}, file)
+            os.replace(f"{path}.tmp", path)
+
+        if segment != self._current_segment:
+            self._current_segment = segment
+            self.prune(timestamp)
+
+    def prune(self, now: float | None = None) -> None:
+        """Delete segments that ended before the retention window."""
+        cutoff = (now or time.time()) - self.retention_days * 86400
+        for start in self._segments():
+            if start + self.segment_seconds > cutoff:
+                break
+            _LOGGER.debug("Removing expired sample segment %s", start)
+            os.remove(self._segment_path(start))
+
+    @staticmethod
+    def _bisect(mapped: mmap.mmap, count: int, timestamp: float) -> int:
+        """Return the first record index at or after a timestamp."""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if RECORD.unpack_from(mapped, middle * RECORD.size)[0] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    @staticmethod
+    def _find_device(
+        mapped: mmap.mmap, first: int, last: int, key: int
+    ) -> Iterator[tuple[float, int, int, float]]:
+        """Yield one device's records between two offsets by byte search."""
+        pattern = key.to_bytes(8, "little")
+        position = mapped.find(pattern, first + 8, last)
+        while position != -1:
+            offset = position - 8
+            if (offset - first) % RECORD.size == 0:
+                yield RECORD.unpack_from(mapped, offset)
+                position = mapped.find(pattern, position + RECORD.size, last)
+            else:
+                position = mapped.find(pattern, position + 1, last)
+
+    def _scan(
+        self, start: float, end: float, key: int | None = None
+    ) -> Iterator[tuple[float, int, int, float]]:
+        """Yield raw records with start <= timestamp < end, optionally of one device."""
+        for segment in self._segments():
+            if segment + self.segment_seconds <= start or segment >= end:
+                continue
+            path = self._segment_path(segment)
+            count = os.path.getsize(path) // RECORD.size
+            if not count:
+                continue
+            # Map whole records only, leaving out a partial one being written
+            with open(path, "rb") as file, mmap.mmap(
+                file.fileno(), count * RECORD.size, access=mmap.ACCESS_READ
+            ) as mapped:
+                first = self._bisect(mapped, count, start) * RECORD.size
+                last = self._bisect(mapped, count, end) * RECORD.size
+                if key is None:
+                    yield from RECORD.iter_unpack(mapped[first:last])
+                else:
+                    yield from self._find_device(mapped, first, last, key)
+
+    def query(
+        self,
+        start: float,
+        end: float,
+        device_id: str | None = None,
+        metric: str | None = None,
+        limit: int | None = None,
+    ) -> list[tuple[float, str, str, float]]:
+        """Return (timestamp, device id, metric, value) samples in a time range."""
+        with self._lock:
+            devices = self._load_devices()
+        key = device_hash(device_id) if device_id is not None else None
+        metric_id = METRICS.get(metric) if metric is not None else None
+        if metric is not None and metric_id is None:
+            return []
+
+        results = []
+        for timestamp, record_key, record_metric, value in self._scan(start, end, key):
+            if key is not None and record_key != key:
+                continue
+            if metric_id is not None and record_metric != metric_id:
+                continue
+            results.append(
+                (timestamp, devices.get(record_key, str(record_key)), METRIC_NAMES[record_metric], value)
+            )
+            if limit and len(results) >= limit:
+                break
+        return results
@@ -0,0 +1,202 @@
+"""Native asyncio subnet scanner for NetworkNest."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import logging
+import time
+from typing import Any
+
+from .const import (
+    SCAN_ALIVE_TTL,
+    SCAN_CONCURRENCY,
+    SCAN_DEAD_TTL,
+    SCAN_MAX_HOSTS,
+    SCAN_PORTS,
+    SCAN_TIMEOUT,
+)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+_LOGGER = logging.getLogger(__name__)
+
+ARP_TABLE = "/proc/net/arp"
+ARP_FLAG_COMPLETE = 0x2
+
+
+def parse_subnets(value: str | list[str]) -> list[str]:
+    """Parse a comma separated list of subnets, raising ValueError if invalid."""
+    if isinstance(value, str):
+        value = [part.strip() for part in value.split(",")]
+    subnets = []
+    hosts = 0
+    for subnet in value:
+        if not subnet:
+            continue
+        network = ipaddress.ip_network(subnet, strict=False)
+        if network.version != 4:
+            raise ValueError(f"Only IPv4 subnets can be scanned: {subnet}")
+        hosts += network.num_addresses
+        subnets.append(str(network))
+    if hosts > SCAN_MAX_HOSTS:
+        raise ValueError(f"Subnets cover {hosts} addresses, the limit is {SCAN_MAX_HOSTS}")
+    return subnets
+
+
+def read_arp_table() -> dict[str, str]:
+    """Return the complete entries of the kernel ARP table as {ip: mac}."""
+    entries: dict[str, str] = {}
+    try:
+        with open(ARP_TABLE, encoding="ascii") as arp:
+            next(arp, None)
+            for line in arp:
+                fields = line.split()
+                if len(fields) >= 4 and int(fields[2], 16) & ARP_FLAG_COMPLETE:
+                    entries[fields[0]] = fields[3]
+    except (OSError, ValueError):
+        pass
+    return entries
+
+
+def _fd_budget(concurrency: int) -> int:
+    """Cap the concurrency so probes use at most a quarter of the fd limit."""
+    if resource is None:
+        return concurrency
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft == resource.RLIM_INFINITY:
+        return concurrency
+    return max(1, min(concurrency, soft // 4))
+
+
+class SubnetScanner:
+    """Sweep subnets with TCP connect and ARP table probes.
+
+    Results are cached per host; each scan only probes hosts whose cached
+    result has expired, so steady-state scans touch a handful of hosts.
+    """
+
+    def __init__(
+        self,
+        subnets: list[str],
+        ports: tuple[int, ...] = SCAN_PORTS,
+        concurrency: int = SCAN_CONCURRENCY,
+        timeout: float = SCAN_TIMEOUT,
+        alive_ttl: float = SCAN_ALIVE_TTL,
+        dead_ttl: float = SCAN_DEAD_TTL,
+    ) -> None:
+        """Initialize the scanner."""
+        self.hosts = [
+            str(host)
+            for subnet in subnets
+            for host in ipaddress.ip_network(subnet, strict=False).hosts()
+        ]
+        self.ports = ports
+        self.timeout = timeout
+        self.alive_ttl = alive_ttl
+        self.dead_ttl = dead_ttl
+        # Each host being probed holds one socket per port
+        sockets_per_host = max(1, len(ports))
+        self._semaphore = asyncio.Semaphore(
+            max(1, _fd_budget(concurrency * sockets_per_host) // sockets_per_host)
+        )
+        # ip -> (open ports or None when down, expiry on the monotonic clock)
+        self._cache: dict[str, tuple[list[int] | None, float]] = {}
+        self._macs: dict[str, str] = {}
+        self._seen: set[str] = set()
+
+    async def _probe_port(self, host: str, port: int) -> bool | None:
+        """Return True if the port is open, False if refused, None if silent."""
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port), timeout=self.timeout
+            )
+        except ConnectionRefusedError:
+            return False
+        except (OSError, asyncio.TimeoutError):
+            return None
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+        return True
+
+    async def _probe_port_of(self, host: str, port: int) -> tuple[int, bool | None]:
+        """Probe a port, returning it with the result."""
+        return port, await self._probe_port(host, port)
+
+    async def _probe_host(self, host: str) -> list[int] | None:
+        """Probe a host, returning its open ports or None if it did not answer.
+
+        The ports are probed together and the first open port or refusal
+        settles the host, so a silent host costs one timeout, not one per port.
+        """
+        async with self._semaphore:
+            probes = [
+                asyncio.ensure_future(self._probe_port_of(host, port)) for port in self.ports
+            ]
+            try:
+                for probe in asyncio.as_completed(probes):
+                    port, result = await probe
+                    if result is True:
+                        return [port]
+                    if result is False:
+                        # A refused connection still proves the host is up
+                        return []
+            finally:
+                for probe in probes:
+                    probe.cancel()
+                await asyncio.gather(*probes, return_exceptions=True)
+        return None
+
+    async def async_scan(self) -> list[dict[str, Any]]:
+        """Probe stale hosts and return every host that has been seen."""
+        loop = asyncio.get_running_loop()
+        now = time.monotonic()
+        stale = [
+            host for host in self.hosts
+            if host not in self._cache or self._cache[host][1] <= now
+        ]
+
+        if stale:
+            start = time.monotonic()
+            results = await asyncio.gather(*(self._probe_host(host) for host in stale))
+
+            # Probes populate the ARP table even for hosts that drop TCP
+            arp = await loop.run_in_executor(None, read_arp_table)
+            now = time.monotonic()
+            for host, ports in zip(stale, results):
+                if ports is None and host in arp:
+                    ports = []
+                if host in arp:
+                    self._macs[host] = arp[host]
+                ttl = self.dead_ttl if ports is None else self.alive_ttl
+                self._cache[host] = (ports, now + ttl)
+
+            _LOGGER.debug(
+                "Probed %d stale hosts in %.2fs", len(stale), time.monotonic() - start
+            )
+
+        devices = []
+        for host in self.hosts:
+            ports = self._cache.get(host, (None, 0))[0]
+            if ports is None and host not in self._seen:
+                continue
+            self._seen.add(host)
+            devices.append(
+                {
+                    "id": f"scan_{host.replace('.', '_')}",
+                    "name": f"Device {host}",
+                    "type": "Network Device",
+                    "ip": host,
+                    "mac": self._macs.get(host),
+                    "status": "offline" if ports is None else "online",
+                    "open_ports": ports or [],
+                    "bandwidth": "0 MB/s",
+                    "source": "scan",
+                }
+            )
+        return devices
@@ -0,0 +1,127 @@
+"""Coalescing, rate-limited refresh scheduler for NetworkNest."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+
+from .const import REFRESH_RATE_BURST, REFRESH_RATE_LIMIT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Token bucket that hands out the wait needed for the next token."""
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        """Initialize a full bucket refilling at rate tokens per second."""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take a token and return how long to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.rate
+
+
+class RefreshScheduler:
+    """Run manual refreshes with one in-flight fetch per entry.
+
+    A refresh requested while one is already pending or running for the
+    same entry waits for that one instead of starting another. Fetches
+    sharing a rate limit key (the API key) draw from one token bucket; an
+    entry polling several API keys takes a token from each of their buckets.
+    """
+
+    def __init__(
+        self, rate: float = REFRESH_RATE_LIMIT, burst: int = REFRESH_RATE_BURST
+    ) -> None:
+        """Initialize the scheduler."""
+        self.rate = rate
+        self.burst = burst
+        self.requested = 0
+        self.coalesced = 0
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    async def _refresh(
+        self, entry_id: str, coordinator: Any, rate_key: str | tuple[str, ...]
+    ) -> None:
+        """Wait for a token from every bucket, then refresh the coordinator."""
+        delay = 0.0
+        for key in (rate_key,) if isinstance(rate_key, str) else rate_key:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            delay = max(delay, bucket.reserve())
+        if delay:
+            _LOGGER.debug("Rate limiting refresh of %s for %.1fs", entry_id, delay)
+            await asyncio.sleep(delay)
+        try:
+            await coordinator.async_refresh()
+        finally:
+            self._in_flight.pop(entry_id, None)
+
+    async def async_refresh(
+        self, entry_id: str, coordinator: Any, rate_key: str | tuple[str, ...]
+    ) -> bool:
+        """Refresh an entry, returning True if the request was coalesced."""
+        self.requested += 1
+        task = self._in_flight.get(entry_id)
+        coalesced = task is not None
+        if coalesced:
+            self.coalesced += 1
+        else:
+            task = asyncio.create_task(self._refresh(entry_id, coordinator, rate_key))
+            self._in_flight[entry_id] = task
+        # Shield so one cancelled caller does not cancel the shared refresh
+        await asyncio.shield(task)
+        return coalesced
+
+    async def async_refresh_many(
+        self, targets: list[tuple[str, Any, str | tuple[str, ...]]]
+    ) -> dict[str, Any]:
+        """Refresh several entries concurrently and report what happened."""
+        start = time.monotonic()
+        results = await asyncio.gather(
+            *(self.async_refresh(*target) for target in targets),
+            return_exceptions=True,
+        )
+        failed = 0
+        for (entry_id, coordinator, _), result in zip(targets, results):
+            # Coordinators log and swallow their own update errors
+            if isinstance(result, asyncio.CancelledError):
+                # The entry was unloaded while its refresh was pending
+                failed += 1
+                _LOGGER.debug("NetworkNest refresh of %s was cancelled", entry_id)
+                continue
+            if isinstance(result, Exception):
+                error = result
+            elif not coordinator.last_update_success:
+                error = coordinator.last_exception
+            else:
+                continue
+            failed += 1
+            _LOGGER.error("NetworkNest refresh of %s failed: %s", entry_id, error)
+        return {
+            "entries": len(targets),
+            "coalesced": sum(1 for result in results if result is True),
+            "failed": failed,
+            "duration": round(time.monotonic() - start, 3),
+            "coalesced_total": self.coalesced,
+        }
+
+    def cancel(self, entry_id: str | None = None) -> None:
+        """Cancel the pending refresh of an entry, or of all entries."""
+        entry_ids = [entry_id] if entry_id is not None else list(self._in_flight)
+        for pending in entry_ids:
+            if task := self._in_flight.pop(pending, None):
+                task.cancel()
@@ -11,7 +11,7 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import UnitOfDataRate, UnitOfTime
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
@@ -52,6 +52,11 @@ async def async_setup_entry(
         if "uptime" in coordinator.data:
             entities.append(NetworkUptimeSensor(coordinator, config_entry))
         
+        # Create per-site sensors so each site gets its own device
+        if isinstance(coordinator.data.get("sites"), dict):
+            for site_id in coordinator.data["sites"]:
+                entities.append(SiteStatusSensor(coordinator, config_entry, site_id))
+        
         # Create individual device sensors
         if "devices" in coordinator.data and isinstance(coordinator.data["devices"], list):
             for device in coordinator.data["devices"]:
@@ -138,7 +143,6 @@ class NetworkStatusSensor(NetworkNestSensorBase):
     ) -> None:
         """Initialize the network status sensor."""
         super().__init__(coordinator, config_entry, "network_status", "Network Status")
-        self._attr_device_class = SensorDeviceClass.CONNECTIVITY
         self._attr_icon = "mdi:network"
 
 
@@ -210,6 +214,58 @@ class NetworkBandwidthUpSensor(NetworkNestSensorBase):
         return None
 
 
+class SiteStatusSensor(CoordinatorEntity, SensorEntity):
+    """Network status of one site in a multi-site entry."""
+
+    def __init__(
+        self,
+        coordinator: NetworkNestDataUpdateCoordinator,
+        config_entry: ConfigEntry,
+        site_id: str,
+    ) -> None:
+        """Initialize the site status sensor."""
+        super().__init__(coordinator)
+        self.site_id = site_id
+        site_name = coordinator.data["sites"][site_id].get("name", site_id)
+        
+        self._attr_name = f"NetworkNest {site_name} Status"
+        self._attr_unique_id = f"{config_entry.entry_id}_site_{site_id}_status"
+        self._attr_icon = "mdi:office-building"
+        
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{config_entry.entry_id}_site_{site_id}")},
+            name=f"NetworkNest {site_name}",
+            manufacturer="NetworkNest",
+            model="Network Site",
+            via_device=(DOMAIN, config_entry.entry_id),
+        )
+
+    @property
+    def _site(self) -> dict[str, Any]:
+        """Return the latest status of this site."""
+        if self.coordinator.data and isinstance(self.coordinator.data.get("sites"), dict):
+            return self.coordinator.data["sites"].get(self.site_id, {})
+        return {}
+
+    @property
+    def native_value(self) -> str:
+        """Return the site network status."""
+        if not self._site.get("available"):
+            return "unreachable"
+        return self._site.get("network_status") or "unknown"
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return additional site attributes."""
+        return {
+            "site_name": self._site.get("name", self.site_id),
+            "connected_devices": self._site.get("connected_devices"),
+            "bandwidth": self._site.get("bandwidth"),
+            "latency": self._site.get("latency"),
+            "error": self._site.get("error"),
+        }
+
+
 class NetworkDeviceSensor(CoordinatorEntity, SensorEntity):
     """Individual network device sensor."""
 
@@ -228,13 +284,20 @@ class NetworkDeviceSensor(CoordinatorEntity, SensorEntity):
         self._attr_name = f"NetworkNest {device_name}"
         self._attr_unique_id = f"{config_entry.entry_id}_device_{device_id}"
         self._attr_icon = self._get_device_icon(device_data.get("type", "generic"))
+        self._last_available = True
+        
+        # Devices reported by a site hang off that site's device
+        if site_id := device_data.get("site"):
+            via_device = (DOMAIN, f"{config_entry.entry_id}_site_{site_id}")
+        else:
+            via_device = (DOMAIN, config_entry.entry_id)
         
         self._attr_device_info = DeviceInfo(
             identifiers={(DOMAIN, f"{config_entry.entry_id}_device_{device_id}")},
             name=device_name,
             manufacturer="NetworkNest",
             model=device_data.get("type", "Network Device"),
-            via_device=(DOMAIN, config_entry.entry_id),
+            via_device=via_device,
         )
 
     def _get_device_icon(self, device_type: str) -> str:
@@ -254,27 +317,40 @@ class NetworkDeviceSensor(CoordinatorEntity, SensorEntity):
         }
         return icons.get(device_type, "mdi:devices")
 
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when device details were fetched or availability changed."""
+        if self.coordinator.devices_updated or self.available != self._last_available:
+            self._last_available = self.available
+            super()._handle_coordinator_update()
+
+    @property
+    def available(self) -> bool:
+        """Return False while the device's site is failing."""
+        # Site status comes with every summary poll, device details less often
+        sites = (self.coordinator.data or {}).get("sites")
+        if (site_id := self.device_data.get("site")) and isinstance(sites, dict):
+            if not sites.get(site_id, {}).get("available", True):
+                return False
+        return super().available
+
     @property
     def native_value(self) -> str:
         """Return the device status."""
-        if self.coordinator.data and "devices" in self.coordinator.data:
-            for device in self.coordinator.data["devices"]:
-                if device.get("id") == self.device_data.get("id"):
-                    return device.get("status", "unknown")
+        if device := self.coordinator.get_device(self.device_data.get("id")):
+            return device.get("status", "unknown")
         return self.device_data.get("status", "unknown")
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
         """Return additional device attributes."""
-        if self.coordinator.data and "devices" in self.coordinator.data:
-            for device in self.coordinator.data["devices"]:
-                if device.get("id") == self.device_data.get("id"):
-                    return {
-                        "device_type": device.get("type", "unknown"),
-                        "ip_address": device.get("ip", "unknown"),
-                        "bandwidth": device.get("bandwidth", "0 MB/s"),
-                        "friendly_name": device.get("name", "Unknown Device"),
-                    }
+        if device := self.coordinator.get_device(self.device_data.get("id")):
+            return {
+                "device_type": device.get("type", "unknown"),
+                "ip_address": device.get("ip", "unknown"),
+                "bandwidth": device.get("bandwidth", "0 MB/s"),
+                "friendly_name": device.get("name", "Unknown Device"),
+            }
         
         # Fallback to initial device data
         return {
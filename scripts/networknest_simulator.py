@@ -0,0 +1,428 @@
+"""Load and fault-injection simulator for the NetworkNest states API.
+
+Serves stand-ins for the homeassistant-discovery and homeassistant-states
+edge functions with synthetic networks, and drives many simulated config
+entries against them.
+
+    python scripts/networknest_simulator.py serve --devices 2000 --error-rate 0.02
+    python scripts/networknest_simulator.py drive --url http://127.0.0.1:8765 --entries 200
+
+Without --url, drive starts a simulator in a child process so that serving
+and encoding the synthetic networks does not show up in the driver's
+latency and event loop lag.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import types
+import zlib
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any
+
+import aiohttp
+from aiohttp import web
+
+INTEGRATION_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "custom_components", "networknest"
+)
+SERVE_OPTIONS = (
+    "devices", "churn", "latency", "error_rate", "hang_rate", "hang_seconds",
+    "drip_rate", "drip_chunk", "drip_interval", "oversize_rate", "oversize_bytes",
+)
+DEVICE_TYPES = [
+    "Computer", "Mobile", "Smart TV", "Gaming", "Tablet", "IoT Device", "Router", "Smart Speaker",
+]
+
+
+def load_integration_module(name: str) -> types.ModuleType:
+    """Import an integration module without importing Home Assistant.
+
+    The package __init__ needs Home Assistant, but the API clients do not,
+    so the package is registered without running it.
+    """
+    if "networknest" not in sys.modules:
+        package = types.ModuleType("networknest")
+        package.__path__ = [INTEGRATION_DIR]
+        sys.modules["networknest"] = package
+    return importlib.import_module(f"networknest.{name}")
+
+
+def parse_latency(spec: str):
+    """Return a sampler in seconds for a latency spec given in milliseconds.
+
+    Specs: fixed:50, uniform:10:200, exp:80, lognormal:4:0.5 (mu, sigma of ln ms).
+    """
+    kind, *params = spec.split(":")
+    values = [float(param) for param in params]
+    if kind == "fixed":
+        return lambda: values[0] / 1000
+    if kind == "uniform":
+        return lambda: random.uniform(values[0], values[1]) / 1000
+    if kind == "exp":
+        return lambda: random.expovariate(1 / values[0]) / 1000
+    if kind == "lognormal":
+        return lambda: random.lognormvariate(values[0], values[1]) / 1000
+    raise argparse.ArgumentTypeError(f"Unknown latency distribution {spec}")
+
+
+class SyntheticNetwork:
+    """A network of devices that churns a little on every read."""
+
+    def __init__(self, api_key: str, devices: int, churn: float) -> None:
+        """Create a network seeded from the API key."""
+        self.random = random.Random(zlib.crc32(api_key.encode()))
+        self.churn = churn
+        self.next_id = 0
+        self.devices = [self._new_device() for _ in range(devices)]
+        self.uptime = self.random.uniform(1, 720)
+
+    def _new_device(self) -> dict[str, Any]:
+        """Create a device."""
+        self.next_id += 1
+        index = self.next_id
+        return {
+            "id": f"device_{index}",
+            "name": f"Device {index}",
+            "type": DEVICE_TYPES[index % len(DEVICE_TYPES)],
+            "ip": f"10.{(index >> 16) & 255}.{(index >> 8) & 255}.{index & 255}",
+            "status": "online" if self.random.random() > 0.2 else "offline",
+            "bandwidth": f"{round(self.random.uniform(0, 60), 2)} MB/s",
+        }
+
+    def tick(self) -> None:
+        """Flip statuses, move bandwidth and replace a few devices."""
+        changes = int(len(self.devices) * self.churn) or (1 if self.devices else 0)
+        for _ in range(changes):
+            position = self.random.randrange(len(self.devices))
+            roll = self.random.random()
+            if roll < 0.05:
+                self.devices[position] = self._new_device()
+            elif roll < 0.4:
+                device = self.devices[position]
+                device["status"] = "offline" if device["status"] == "online" else "online"
+            else:
+                self.devices[position]["bandwidth"] = f"{round(self.random.uniform(0, 60), 2)} MB/s"
+        self.uptime += 1 / 120
+
+    def states(self) -> dict[str, Any]:
+        """Return a homeassistant-states payload."""
+        self.tick()
+        online = sum(1 for device in self.devices if device["status"] == "online")
+        bandwidth = round(100 + self.random.uniform(0, 50), 2)
+        return {
+            "bandwidth": bandwidth,
+            "bandwidth_down": bandwidth * 0.8,
+            "bandwidth_up": bandwidth * 0.2,
+            "connected_devices": online,
+            "devices": self.devices,
+            "network_status": "online",
+            "uptime": round(self.uptime, 2),
+            "last_updated": datetime.now(timezone.utc).isoformat(),
+        }
+
+
+class Simulator:
+    """aiohttp application serving the NetworkNest edge functions."""
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        """Initialize from the command line options."""
+        self.args = args
+        self.latency = parse_latency(args.latency)
+        self.networks: dict[str, SyntheticNetwork] = {}
+        self.requests: Counter[str] = Counter()
+
+    def application(self) -> web.Application:
+        """Return the web application."""
+        app = web.Application()
+        app.router.add_get("/functions/v1/homeassistant-discovery", self.discovery)
+        app.router.add_get("/functions/v1/homeassistant-states", self.states)
+        return app
+
+    def _network(self, api_key: str) -> SyntheticNetwork:
+        """Return the network for an API key."""
+        if api_key not in self.networks:
+            self.networks[api_key] = SyntheticNetwork(api_key, self.args.devices, self.args.churn)
+        return self.networks[api_key]
+
+    async def _respond(self, request: web.Request, payload: dict[str, Any]) -> web.StreamResponse:
+        """Respond with injected latency and faults."""
+        args = self.args
+        await asyncio.sleep(self.latency())
+
+        roll = random.random()
+        if roll < args.error_rate:
+            self.requests["error"] += 1
+            status = random.choice((500, 502, 503, 429))
+            return web.json_response({"error": "Injected failure"}, status=status)
+        roll -= args.error_rate
+        if roll < args.hang_rate:
+            self.requests["hang"] += 1
+            await asyncio.sleep(args.hang_seconds)
+            roll = 1.0
+        else:
+            roll -= args.hang_rate
+
+        if roll < args.oversize_rate:
+            self.requests["oversize"] += 1
+            payload = {**payload, "padding": "x" * args.oversize_bytes}
+        body = json.dumps(payload).encode()
+
+        if random.random() < args.drip_rate:
+            self.requests["drip"] += 1
+            response = web.StreamResponse(headers={"Content-Type": "application/json"})
+            response.content_length = len(body)
+            await response.prepare(request)
+            for offset in range(0, len(body), args.drip_chunk):
+                await response.write(body[offset:offset + args.drip_chunk])
+                await asyncio.sleep(args.drip_interval)
+            await response.write_eof()
+            return response
+
+        self.requests["ok"] += 1
+        return web.Response(body=body, content_type="application/json")
+
+    async def discovery(self, request: web.Request) -> web.StreamResponse:
+        """Serve homeassistant-discovery."""
+        api_key = request.headers.get("x-api-key")
+        if not api_key:
+            return web.json_response({"error": "API key required"}, status=401)
+        network = self._network(api_key)
+        return await self._respond(
+            request, {"name": "NetworkNest Simulator", "devices": len(network.devices)}
+        )
+
+    async def states(self, request: web.Request) -> web.StreamResponse:
+        """Serve homeassistant-states."""
+        api_key = request.headers.get("x-api-key")
+        if not api_key:
+            return web.json_response({"error": "API key required"}, status=401)
+        payload = self._network(api_key).states()
+        fields = request.query.get("fields")
+        if fields == "summary":
+            payload = {key: value for key, value in payload.items() if key != "devices"}
+        elif fields == "devices":
+            payload = {
+                key: payload[key] for key in ("connected_devices", "devices", "last_updated")
+            }
+        return await self._respond(request, payload)
+
+
+async def start_simulator(args: argparse.Namespace) -> tuple[web.AppRunner, str, Simulator]:
+    """Start a simulator and return its runner and base URL."""
+    simulator = Simulator(args)
+    runner = web.AppRunner(simulator.application())
+    await runner.setup()
+    site = web.TCPSite(runner, args.host, args.port)
+    await site.start()
+    host, port = site._server.sockets[0].getsockname()[:2]  # pylint: disable=protected-access
+    return runner, f"http://{host}:{port}", simulator
+
+
+async def start_simulator_process(args: argparse.Namespace) -> tuple[asyncio.subprocess.Process, str]:
+    """Start a simulator in a child process and return it and its base URL."""
+    command = [sys.executable, os.path.abspath(__file__), "serve", "--host", args.host, "--port", "0"]
+    for name in SERVE_OPTIONS:
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    process = await asyncio.create_subprocess_exec(*command, stdout=asyncio.subprocess.PIPE)
+    line = await process.stdout.readline()
+    if not line:
+        raise RuntimeError("Simulator process exited before listening")
+    return process, line.decode().split()[-1]
+
+
+def outcome_of(error: BaseException | str) -> str:
+    """Return the outcome label of a failed request or site."""
+    if isinstance(error, aiohttp.ClientResponseError):
+        return f"http_{error.status}"
+    if isinstance(error, str):
+        # Site errors are exception messages, or type names when empty
+        label = error.split(",", 1)[0]
+        if label.isdigit():
+            return f"http_{label}"
+    else:
+        label = type(error).__name__
+    return "timeout" if label == "TimeoutError" else label.split(":", 1)[0]
+
+
+def count_outcomes(outcomes: Counter[str], result: Any) -> None:
+    """Count a poll's outcomes, one per site for multi-site clients."""
+    for payload in result if isinstance(result, list) else [result]:
+        sites = payload.get("sites") if isinstance(payload, dict) else None
+        if not isinstance(sites, dict):
+            outcomes["ok"] += 1
+            continue
+        for site in sites.values():
+            outcomes["ok" if site.get("available") else outcome_of(site.get("error", ""))] += 1
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Return a percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def drive(args: argparse.Namespace) -> None:
+    """Poll the simulator from many simulated config entries and report."""
+    api_module = load_integration_module("api")
+    multisite_module = load_integration_module("multisite")
+
+    process = None
+    url = args.url
+    if not url:
+        process, url = await start_simulator_process(args)
+
+    polls = 0
+    latencies: list[float] = []
+    lags: list[float] = []
+    outcomes: Counter[str] = Counter()
+    stop = asyncio.Event()
+
+    def make_client(entry: int):
+        if args.sites_per_entry > 1:
+            return multisite_module.NetworkNestMultiSiteAPI(
+                [
+                    {"name": f"Site {site}", "api_key": f"key_{entry}_{site}", "base_url": url}
+                    for site in range(args.sites_per_entry)
+                ],
+                timeout=args.timeout,
+            )
+        return api_module.NetworkNestAPI(f"key_{entry}", url)
+
+    async def entry_loop(entry: int) -> None:
+        nonlocal polls
+        client = make_client(entry)
+        # Stagger entries across the interval like independently started timers
+        await asyncio.sleep(random.uniform(0, args.interval))
+        next_devices = 0.0
+        try:
+            while not stop.is_set():
+                start = time.monotonic()
+                if not args.device_interval:
+                    request = client.async_get_states()
+                elif start >= next_devices:
+                    next_devices = start + args.device_interval
+                    request = asyncio.gather(client.async_get_summary(), client.async_get_devices())
+                else:
+                    request = client.async_get_summary()
+                try:
+                    count_outcomes(outcomes, await asyncio.wait_for(request, timeout=args.timeout))
+                except Exception as exc:  # pylint: disable=broad-except
+                    # A multi-site client only raises when every site failed
+                    outcomes[outcome_of(exc)] += args.sites_per_entry
+                polls += 1
+                latencies.append(time.monotonic() - start)
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=args.interval)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await client.close()
+
+    async def lag_monitor() -> None:
+        while not stop.is_set():
+            start = time.monotonic()
+            await asyncio.sleep(0.05)
+            lags.append(time.monotonic() - start - 0.05)
+
+    tasks = [asyncio.create_task(entry_loop(entry)) for entry in range(args.entries)]
+    tasks.append(asyncio.create_task(lag_monitor()))
+    started = time.monotonic()
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*tasks)
+    elapsed = time.monotonic() - started
+    if process:
+        process.terminate()
+        await process.communicate()
+
+    total = sum(outcomes.values())
+    print(f"entries={args.entries} sites_per_entry={args.sites_per_entry} duration={elapsed:.1f}s")
+    print(f"simulator={'external ' + url if args.url else 'child process'}")
+    print(f"polls={polls} requests={total} throughput={total / elapsed:.1f}/s outcomes={dict(outcomes)}")
+    print(
+        "latency ms: p50={:.1f} p90={:.1f} p99={:.1f} max={:.1f} mean={:.1f}".format(
+            percentile(latencies, 0.5) * 1000,
+            percentile(latencies, 0.9) * 1000,
+            percentile(latencies, 0.99) * 1000,
+            max(latencies, default=0) * 1000,
+            statistics.fmean(latencies) * 1000 if latencies else 0,
+        )
+    )
+    print(
+        "event loop lag ms: p50={:.1f} p99={:.1f} max={:.1f}".format(
+            percentile(lags, 0.5) * 1000,
+            percentile(lags, 0.99) * 1000,
+            max(lags, default=0) * 1000,
+        )
+    )
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Run the simulator until interrupted."""
+    runner, url, simulator = await start_simulator(args)
+    print(f"NetworkNest simulator listening on {url}", flush=True)
+    try:
+        while True:
+            await asyncio.sleep(10)
+            print(f"served {dict(simulator.requests)}", flush=True)
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse the command line and run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    faults = argparse.ArgumentParser(add_help=False)
+    faults.add_argument("--host", default="127.0.0.1")
+    faults.add_argument("--port", type=int, default=8765)
+    faults.add_argument("--devices", type=int, default=50, help="devices per API key")
+    faults.add_argument("--churn", type=float, default=0.02, help="fraction of devices changed per read")
+    faults.add_argument("--latency", default="lognormal:4:0.5", help="fixed:MS, uniform:MIN:MAX, exp:MEAN or lognormal:MU:SIGMA")
+    faults.add_argument("--error-rate", type=float, default=0.0)
+    faults.add_argument("--hang-rate", type=float, default=0.0, help="fraction of responses delayed by --hang-seconds")
+    faults.add_argument("--hang-seconds", type=float, default=60.0)
+    faults.add_argument("--drip-rate", type=float, default=0.0, help="fraction of bodies sent in slow chunks")
+    faults.add_argument("--drip-chunk", type=int, default=512)
+    faults.add_argument("--drip-interval", type=float, default=0.05)
+    faults.add_argument("--oversize-rate", type=float, default=0.0)
+    faults.add_argument("--oversize-bytes", type=int, default=5_000_000)
+
+    subparsers.add_parser("serve", parents=[faults], help="run the simulator")
+
+    drive_parser = subparsers.add_parser("drive", parents=[faults], help="poll the simulator")
+    drive_parser.add_argument("--url", help="simulator to poll; started in a child process when omitted")
+    drive_parser.add_argument("--entries", type=int, default=100)
+    drive_parser.add_argument("--sites-per-entry", type=int, default=1)
+    drive_parser.add_argument("--interval", type=float, default=30.0)
+    drive_parser.add_argument(
+        "--device-interval", type=float, default=0.0,
+        help="poll the summary every --interval and devices this often, like the integration; 0 polls full states",
+    )
+    drive_parser.add_argument("--timeout", type=float, default=15.0)
+    drive_parser.add_argument("--duration", type=float, default=120.0)
+    drive_parser.add_argument("--verbose", action="store_true", help="show the clients' own logging")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if getattr(args, "verbose", False) else logging.CRITICAL)
+    try:
+        asyncio.run(serve(args) if args.command == "serve" else drive(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""Stand-in UniFi controller for the NetworkNest local collector.
+
+Serves the small part of the UniFi Network API that UniFiLocalCollector
+uses: login, site health, device and client tables, sysinfo and events.
+Sessions can be expired on demand to exercise re-login, and clients come
+and go with matching connect and disconnect events.
+
+    python scripts/networknest_unifi_simulator.py serve --clients 200
+    python scripts/networknest_unifi_simulator.py serve --unifi-os --churn 5
+
+Point a local mode entry at http://127.0.0.1:8443 with any username and the
+password "secret".
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import secrets
+import time
+from collections import Counter
+from typing import Any
+
+from aiohttp import web
+
+PASSWORD = "secret"
+OS_PREFIX = "/proxy/network"
+CLASSIC_COOKIE = "unifises"
+OS_COOKIE = "TOKEN"
+
+
+def _mac(index: int, vendor: int = 0x02) -> str:
+    """Return a locally administered MAC address for an index."""
+    return ":".join(f"{part:02x}" for part in (vendor, 0, 0, index >> 16 & 255, index >> 8 & 255, index & 255))
+
+
+class UniFiController:
+    """aiohttp application serving a UniFi Network site.
+
+    With unifi_os set it behaves like a UniFi OS console: /api/login is
+    missing, login happens at /api/auth/login with a CSRF token, and the
+    site API lives under /proxy/network.
+    """
+
+    def __init__(self, clients: int = 10, unifi_os: bool = False, site: str = "default") -> None:
+        """Create a controller with a gateway, an access point and some clients."""
+        self.unifi_os = unifi_os
+        self.site = site
+        self.sessions: set[str] = set()
+        self.csrf_token = secrets.token_hex(8)
+        self.requests: Counter[str] = Counter()
+        self.logins = 0
+        self.next_client = 0
+        self.devices = [
+            {"mac": _mac(1, 0x74), "name": "Gateway", "type": "ugw", "ip": "192.168.1.1", "state": 1,
+             "rx_bytes-r": 0, "tx_bytes-r": 0},
+            {"mac": _mac(2, 0x74), "name": "Access Point", "type": "uap", "ip": "192.168.1.2", "state": 1,
+             "rx_bytes-r": 0, "tx_bytes-r": 0},
+        ]
+        self.clients: dict[str, dict[str, Any]] = {}
+        self.events: list[dict[str, Any]] = []
+        for _ in range(clients):
+            self.connect()
+
+    def application(self) -> web.Application:
+        """Return the web application."""
+        prefix = OS_PREFIX if self.unifi_os else ""
+        app = web.Application()
+        if self.unifi_os:
+            app.router.add_post("/api/auth/login", self.login)
+        else:
+            app.router.add_post("/api/login", self.login)
+        app.router.add_get(f"{prefix}/api/s/{{site}}/stat/health", self.health)
+        app.router.add_get(f"{prefix}/api/s/{{site}}/stat/device", self.device)
+        app.router.add_get(f"{prefix}/api/s/{{site}}/stat/sta", self.sta)
+        app.router.add_get(f"{prefix}/api/s/{{site}}/stat/sysinfo", self.sysinfo)
+        app.router.add_post(f"{prefix}/api/s/{{site}}/stat/event", self.event)
+        return app
+
+    def expire_sessions(self) -> None:
+        """Invalidate every session, as a controller restart would."""
+        self.sessions.clear()
+
+    def connect(self, hostname: str | None = None) -> str:
+        """Connect a new client and return its MAC address."""
+        self.next_client += 1
+        index = self.next_client
+        mac = _mac(index)
+        self.clients[mac] = {
+            "mac": mac,
+            "hostname": hostname or f"client-{index}",
+            "ip": f"192.168.1.{10 + index % 240}",
+            "oui": "",
+            "rx_bytes-r": random.randint(0, 2_000_000),
+            "tx_bytes-r": random.randint(0, 500_000),
+        }
+        self._event("EVT_WU_Connected", user=mac)
+        return mac
+
+    def disconnect(self, mac: str) -> None:
+        """Disconnect a client."""
+        self.clients.pop(mac, None)
+        self._event("EVT_WU_Disconnected", user=mac)
+
+    def reconnect(self, mac: str) -> None:
+        """Connect a client that was seen before."""
+        self.clients[mac] = {
+            "mac": mac, "hostname": f"client-{mac[-5:]}", "ip": "192.168.1.250", "oui": "",
+            "rx_bytes-r": 0, "tx_bytes-r": 0,
+        }
+        self._event("EVT_WU_Connected", user=mac)
+
+    def churn(self, changes: int) -> None:
+        """Connect and disconnect a few random clients."""
+        for _ in range(changes):
+            if self.clients and random.random() < 0.5:
+                self.disconnect(random.choice(list(self.clients)))
+            else:
+                self.connect()
+
+    def _event(self, key: str, **fields: str) -> None:
+        """Record a controller event at the current time."""
+        self.events.append(
+            {"_id": secrets.token_hex(12), "key": key, "time": int(time.time() * 1000), **fields}
+        )
+
+    async def login(self, request: web.Request) -> web.Response:
+        """Log in, setting a session cookie."""
+        self.logins += 1
+        credentials = await request.json()
+        if credentials.get("password") != PASSWORD:
+            return web.json_response({"meta": {"rc": "error", "msg": "api.err.Invalid"}}, status=400)
+        token = secrets.token_hex(16)
+        self.sessions.add(token)
+        response = web.json_response({"meta": {"rc": "ok"}, "data": []})
+        response.set_cookie(OS_COOKIE if self.unifi_os else CLASSIC_COOKIE, token, path="/")
+        if self.unifi_os:
+            response.headers["x-csrf-token"] = self.csrf_token
+        return response
+
+    def _authorized(self, request: web.Request) -> bool:
+        """Return whether the request carries a live session."""
+        token = request.cookies.get(OS_COOKIE if self.unifi_os else CLASSIC_COOKIE)
+        if token not in self.sessions:
+            return False
+        return not self.unifi_os or request.headers.get("x-csrf-token") == self.csrf_token
+
+    def _respond(self, request: web.Request, data: list[dict[str, Any]]) -> web.Response:
+        """Respond with the UniFi envelope, or 401 without a session."""
+        self.requests[request.path.partition("/api/s/")[2].partition("/")[2]] += 1
+        if request.match_info["site"] != self.site:
+            return web.json_response({"meta": {"rc": "error", "msg": "api.err.NoSiteContext"}}, status=400)
+        if not self._authorized(request):
+            return web.json_response({"meta": {"rc": "error", "msg": "api.err.LoginRequired"}}, status=401)
+        return web.json_response({"meta": {"rc": "ok"}, "data": data})
+
+    async def health(self, request: web.Request) -> web.Response:
+        """Serve stat/health."""
+        return self._respond(
+            request,
+            [
+                {"subsystem": "wan", "status": "ok", "rx_bytes-r": 1_250_000, "tx_bytes-r": 250_000,
+                 "gw_system-stats": {"uptime": "86400"}},
+                {"subsystem": "lan", "status": "ok", "num_user": 0},
+                {"subsystem": "wlan", "status": "ok", "num_user": len(self.clients)},
+            ],
+        )
+
+    async def device(self, request: web.Request) -> web.Response:
+        """Serve stat/device."""
+        return self._respond(request, self.devices)
+
+    async def sta(self, request: web.Request) -> web.Response:
+        """Serve stat/sta."""
+        return self._respond(request, list(self.clients.values()))
+
+    async def sysinfo(self, request: web.Request) -> web.Response:
+        """Serve stat/sysinfo."""
+        return self._respond(request, [{"version": "8.0.0", "name": "NetworkNest Stand-in"}])
+
+    async def event(self, request: web.Request) -> web.Response:
+        """Serve stat/event, newest first like the controller."""
+        query = await request.json() if request.can_read_body else {}
+        since = (time.time() - query.get("within", 1) * 3600) * 1000
+        events = [event for event in reversed(self.events) if event["time"] >= since]
+        return self._respond(request, events[: query.get("_limit", 3000)])
+
+
+async def start_controller(
+    controller: UniFiController, host: str = "127.0.0.1", port: int = 0
+) -> tuple[web.AppRunner, str]:
+    """Start a controller and return its runner and base URL."""
+    runner = web.AppRunner(controller.application())
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_host, bound_port = site._server.sockets[0].getsockname()[:2]  # pylint: disable=protected-access
+    return runner, f"http://{bound_host}:{bound_port}"
+
+
+async def serve(args: argparse.Namespace) -> None:
+    """Run the controller until interrupted."""
+    controller = UniFiController(args.clients, args.unifi_os, args.site)
+    runner, url = await start_controller(controller, args.host, args.port)
+    print(f"UniFi stand-in listening on {url} (password {PASSWORD!r})")
+    try:
+        while True:
+            await asyncio.sleep(10)
+            controller.churn(args.churn)
+            print(f"clients={len(controller.clients)} served {dict(controller.requests)}")
+    finally:
+        await runner.cleanup()
+
+
+def main() -> None:
+    """Parse the command line and run."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="run the controller")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8443)
+    serve_parser.add_argument("--site", default="default")
+    serve_parser.add_argument("--clients", type=int, default=20)
+    serve_parser.add_argument("--churn", type=int, default=2, help="clients connecting or leaving every 10s")
+    serve_parser.add_argument("--unifi-os", action="store_true", help="behave like a UniFi OS console")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
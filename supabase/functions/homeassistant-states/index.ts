@@ -130,8 +130,22 @@ serve(async (req) => {
       last_updated: networkData.last_updated
     }
 
+    // Tiered polling: "summary" omits the device list, "devices" returns only it
+    const fields = new URL(req.url).searchParams.get('fields')
+    let body: Record<string, unknown> = response
+    if (fields === 'summary') {
+      const { devices, ...summary } = response
+      body = summary
+    } else if (fields === 'devices') {
+      body = {
+        connected_devices: response.connected_devices,
+        devices: response.devices,
+        last_updated: response.last_updated
+      }
+    }
+
     return new Response(
-      JSON.stringify(response),
+      JSON.stringify(body),
       { 
         headers: { 
           ...corsHeaders, 
@@ -0,0 +1,21 @@
+"""Helpers shared by the NetworkNest tests."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Coroutine
+from typing import Any
+
+
+def run(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine on a private event loop.
+
+    Unlike asyncio.run this leaves the current event loop alone, which
+    Home Assistant's test harness relies on when it is installed.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.run_until_complete(loop.shutdown_default_executor())
+        loop.close()
@@ -0,0 +1,37 @@
+"""Shared fixtures for the NetworkNest tests.
+
+The integration modules that do not need Home Assistant are loaded through
+the simulator's loader, so these tests run without Home Assistant
+installed. The stand-in servers live in scripts/.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "scripts"))
+sys.path.insert(0, ROOT)
+
+
+def pytest_configure(config):
+    """Run async tests without marks when pytest-asyncio is installed.
+
+    Home Assistant's test harness (pytest-homeassistant-custom-component)
+    provides unmarked async fixtures such as hass, which need auto mode.
+    """
+    if config.pluginmanager.hasplugin("asyncio"):
+        config.option.asyncio_mode = "auto"
+
+
+@pytest.fixture(autouse=True)
+def allow_loopback_sockets(request):
+    """Allow loopback sockets under Home Assistant's harness, which blocks them."""
+    if request.config.pluginmanager.hasplugin("socket"):
+        import pytest_socket  # pylint: disable=import-outside-toplevel
+
+        request.getfixturevalue("socket_enabled")
+        # The scanner tests sweep loopback addresses beyond 127.0.0.1
+        pytest_socket.socket_allow_hosts([f"127.0.0.{host}" for host in range(256)])
@@ -0,0 +1,65 @@
+"""Tests for the config flow against the stand-in servers.
+
+Needs Home Assistant's test harness:
+
+    pip install pytest-homeassistant-custom-component
+    python -m pytest tests/test_config_flow.py
+"""
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+from homeassistant import config_entries  # noqa: E402
+from homeassistant.data_entry_flow import FlowResultType  # noqa: E402
+
+from custom_components.networknest.const import (  # noqa: E402
+    CONF_HOST,
+    CONF_PASSWORD,
+    CONF_USERNAME,
+    DOMAIN,
+    MODE_LOCAL,
+)
+from networknest_unifi_simulator import PASSWORD, UniFiController, start_controller  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture(params=[False, True], ids=["classic", "unifi_os"])
+async def controller_url(request):
+    """Run a stand-in UniFi controller."""
+    runner, url = await start_controller(UniFiController(clients=2, unifi_os=request.param))
+    yield url
+    await runner.cleanup()
+
+
+async def submit_local(hass, url: str, password: str) -> dict:
+    """Start a local flow and submit the controller form."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {"next_step_id": MODE_LOCAL}
+    )
+    return await hass.config_entries.flow.async_configure(
+        result["flow_id"],
+        {CONF_HOST: url, CONF_USERNAME: "admin", CONF_PASSWORD: password},
+    )
+
+
+async def test_local_wrong_password(hass, controller_url):
+    """A rejected login is reported as bad credentials, not a connection failure."""
+    result = await submit_local(hass, controller_url, "wrong")
+    assert result["type"] is FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_credentials"}
+
+
+async def test_local_cannot_connect(hass, unused_tcp_port):
+    """A controller that is not there is a connection failure."""
+    result = await submit_local(hass, f"http://127.0.0.1:{unused_tcp_port}", PASSWORD)
+    assert result["errors"] == {"base": "cannot_connect"}
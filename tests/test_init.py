@@ -0,0 +1,212 @@
+"""Tests for the integration setup, options and services.
+
+Needs Home Assistant's test harness:
+
+    pip install pytest-homeassistant-custom-component
+    python -m pytest tests/test_init.py
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import glob
+import os
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+import voluptuous as vol  # noqa: E402
+from homeassistant.const import STATE_UNAVAILABLE  # noqa: E402
+from homeassistant.helpers import entity_registry as er  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.networknest import DATA_REFRESH_SCHEDULER  # noqa: E402
+from custom_components.networknest.const import (  # noqa: E402
+    CONF_API_KEY,
+    CONF_BASE_URL,
+    CONF_SCAN_SUBNETS,
+    CONF_SITE_NAME,
+    CONF_SITES,
+    DOMAIN,
+    UPDATE_INTERVAL,
+)
+from custom_components.networknest.scanner import SubnetScanner  # noqa: E402
+from networknest_simulator import start_simulator  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+@pytest.fixture
+async def simulator_url():
+    """Run the states simulator with a small, fault-free network."""
+    args = argparse.Namespace(
+        host="127.0.0.1", port=0, devices=5, churn=0.0, latency="fixed:1",
+        error_rate=0.0, hang_rate=0.0, hang_seconds=0.0, drip_rate=0.0,
+        drip_chunk=512, drip_interval=0.0, oversize_rate=0.0, oversize_bytes=0,
+    )
+    runner, url, _ = await start_simulator(args)
+    yield url
+    await runner.cleanup()
+
+
+@pytest.fixture
+async def setup_entry(hass, simulator_url):
+    """Return a coroutine setting up a cloud entry against the simulator."""
+    hass.http = MagicMock(async_register_static_paths=AsyncMock())
+    entries = []
+
+    async def setup(**options) -> MockConfigEntry:
+        entry = MockConfigEntry(
+            domain=DOMAIN,
+            data={CONF_API_KEY: "main", CONF_BASE_URL: simulator_url},
+            options=options,
+        )
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+        entries.append(entry)
+        return entry
+
+    with patch("custom_components.networknest.add_extra_js_url"):
+        yield setup
+        for entry in entries:
+            if hass.config_entries.async_get_entry(entry.entry_id):
+                await hass.config_entries.async_unload(entry.entry_id)
+        await hass.async_block_till_done()
+
+
+def device_entities(hass, entry) -> dict[str, str]:
+    """Return {unique_id: entity_id} of the entry's per-device sensors."""
+    return {
+        entity.unique_id: entity.entity_id
+        for entity in er.async_entries_for_config_entry(er.async_get(hass), entry.entry_id)
+        if entity.unique_id.startswith(f"{entry.entry_id}_device_")
+    }
+
+
+async def test_adding_a_site_keeps_existing_device_entities(hass, setup_entry, simulator_url):
+    """Going from one site to several adds entities without orphaning the old ones."""
+    entry = await setup_entry()
+    before = device_entities(hass, entry)
+    assert len(before) == 5
+
+    hass.config_entries.async_update_entry(
+        entry,
+        options={
+            CONF_SITES: [
+                {CONF_SITE_NAME: "Office", CONF_API_KEY: "office", CONF_BASE_URL: simulator_url}
+            ]
+        },
+    )
+    await hass.async_block_till_done()
+
+    after = device_entities(hass, entry)
+    assert before.items() <= after.items()
+    coordinator = hass.data[DOMAIN][entry.entry_id]
+    main, office = coordinator.data["sites"]
+    # The main site's devices are not duplicated under a site prefix
+    assert not any(unique_id.startswith(f"{entry.entry_id}_device_{main}_") for unique_id in after)
+    assert any(unique_id.startswith(f"{entry.entry_id}_device_{office}_") for unique_id in after)
+    for device in coordinator.data["devices"]:
+        if device["site"] == main:
+            entity_id = after[f"{entry.entry_id}_device_{device['id']}"]
+            assert hass.states.get(entity_id).state != STATE_UNAVAILABLE
+
+
+async def test_subnet_scan_runs_in_the_background(hass, setup_entry):
+    """Setup does not wait for a scan; its hosts are merged once it finishes."""
+    release = asyncio.Event()
+    scanned = {
+        "id": "scan_192_0_2_1", "name": "Device 192.0.2.1", "type": "Network Device",
+        "ip": "192.0.2.1", "status": "online", "open_ports": [], "source": "scan",
+    }
+
+    async def slow_scan(self):
+        await release.wait()
+        return [scanned]
+
+    with patch.object(SubnetScanner, "async_scan", slow_scan):
+        async with asyncio.timeout(5):
+            entry = await setup_entry(**{CONF_SCAN_SUBNETS: ["192.0.2.0/30"]})
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        assert scanned["id"] not in coordinator.device_index
+
+        release.set()
+        await hass.async_block_till_done(wait_background_tasks=True)
+        async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=UPDATE_INTERVAL + 1))
+        await hass.async_block_till_done(wait_background_tasks=True)
+        assert coordinator.device_index[scanned["id"]]["ip"] == "192.0.2.1"
+
+
+async def test_refresh_is_rate_limited_by_the_keys_in_use(hass, setup_entry, simulator_url):
+    """Manual refreshes draw from the option API keys, one bucket per site key."""
+    await setup_entry(
+        **{
+            CONF_API_KEY: "rotated",
+            CONF_SITES: [
+                {CONF_SITE_NAME: "Office", CONF_API_KEY: "office", CONF_BASE_URL: simulator_url}
+            ],
+        }
+    )
+    await hass.services.async_call(DOMAIN, "refresh_data", {}, blocking=True)
+    scheduler = hass.data[DATA_REFRESH_SCHEDULER]
+    assert set(scheduler._buckets) == {"rotated", "office"}
+
+
+async def test_removing_an_entry_deletes_its_samples(hass, setup_entry):
+    """The sample log of a removed entry does not stay on disk."""
+    entry = await setup_entry()
+    path = hass.data[DOMAIN][entry.entry_id].sample_log.directory
+    assert os.listdir(path)
+
+    assert (await hass.config_entries.async_remove(entry.entry_id))["require_restart"] is False
+    await hass.async_block_till_done()
+    assert not os.path.exists(path)
+
+
+async def test_profile_service(hass, setup_entry):
+    """Profiles are written for a cycle count and for a short flamegraph run."""
+    await setup_entry()
+    pattern = hass.config.path("networknest_profile_*")
+    for path in glob.glob(pattern):
+        os.remove(path)
+
+    try:
+        await hass.services.async_call(DOMAIN, "profile", {"cycles": 2}, blocking=True)
+        await hass.services.async_call(
+            DOMAIN, "profile", {"duration": 1, "format": "flamegraph"}, blocking=True
+        )
+        written = glob.glob(pattern)
+        assert [path for path in written if path.endswith(".prof")]
+        assert [path for path in written if path.endswith(".folded")]
+    finally:
+        for path in glob.glob(pattern):
+            os.remove(path)
+
+
+@pytest.mark.parametrize(
+    ("service", "data"),
+    [
+        ("profile", {"duration": "abc"}),
+        ("profile", {"cycles": 0}),
+        ("profile", {"cycles": -1}),
+        ("profile", {"format": "svg"}),
+        ("export_samples", {"metric": "latency"}),
+    ],
+)
+async def test_service_arguments_are_validated(hass, setup_entry, service, data):
+    """Invalid service arguments are rejected by the schema."""
+    await setup_entry()
+    with pytest.raises(vol.Invalid):
+        await hass.services.async_call(DOMAIN, service, data, blocking=True)
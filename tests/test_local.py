@@ -0,0 +1,163 @@
+"""Tests for the local UniFi controller collector against the stand-in."""
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from common import run
+from networknest_simulator import load_integration_module
+from networknest_unifi_simulator import PASSWORD, UniFiController, start_controller
+
+local = load_integration_module("local")
+
+
+def run_against(controller: UniFiController, scenario, **options):
+    """Run a scenario coroutine with a collector logged in to the controller."""
+
+    async def main():
+        runner, url = await start_controller(controller)
+        collector = local.UniFiLocalCollector(url, "admin", PASSWORD, **options)
+        try:
+            return await scenario(collector)
+        finally:
+            await collector.close()
+            await runner.cleanup()
+
+    return run(main())
+
+
+def statuses(data):
+    """Return {mac: status} from a devices payload."""
+    return {device["mac"]: device["status"] for device in data["devices"]}
+
+
+def test_full_sync_and_summary():
+    """The first poll logs in and reads the device and client tables."""
+    controller = UniFiController(clients=3)
+
+    async def scenario(collector):
+        return await collector.async_get_states()
+
+    data = run_against(controller, scenario)
+    assert controller.logins == 1
+    assert controller.requests["stat/device"] == 1
+    assert controller.requests["stat/sta"] == 1
+    assert len(data["devices"]) == 5
+    assert data["connected_devices"] == 5
+    assert data["network_status"] == "online"
+    assert data["bandwidth_down"] == 10.0
+    assert {device["type"] for device in data["devices"]} >= {"Router", "Access Point"}
+
+
+def test_unifi_os_login():
+    """UniFi OS consoles are detected and served under the network prefix."""
+    controller = UniFiController(clients=2, unifi_os=True)
+
+    async def scenario(collector):
+        return await collector.async_get_devices(), collector._prefix
+
+    data, prefix = run_against(controller, scenario)
+    assert prefix == "/proxy/network"
+    assert len(data["devices"]) == 4
+
+
+def test_relogin_after_session_expiry():
+    """A 401 logs in again once and retries the request."""
+    controller = UniFiController(clients=2)
+
+    async def scenario(collector):
+        await collector.async_get_summary()
+        controller.expire_sessions()
+        return await collector.async_get_summary()
+
+    data = run_against(controller, scenario)
+    assert controller.logins == 2
+    assert data["connected_devices"] == 2
+
+
+def test_incremental_events_between_full_syncs():
+    """Between full syncs only events are read and applied."""
+    controller = UniFiController(clients=3)
+    leaving = next(iter(controller.clients))
+
+    async def scenario(collector):
+        await collector.async_get_devices()
+        controller.disconnect(leaving)
+        after_leave = statuses(await collector.async_get_devices())
+        controller.reconnect(leaving)
+        after_return = statuses(await collector.async_get_devices())
+        return after_leave, after_return
+
+    after_leave, after_return = run_against(controller, scenario, full_sync_polls=10)
+    assert after_leave[leaving] == "offline"
+    assert after_return[leaving] == "online"
+    assert controller.requests["stat/sta"] == 1
+    assert controller.requests["stat/event"] == 2
+
+
+def test_unknown_client_triggers_full_sync():
+    """A client the collector has not seen is picked up by a full sync."""
+    controller = UniFiController(clients=1)
+
+    async def scenario(collector):
+        await collector.async_get_devices()
+        joined = controller.connect("new-phone")
+        await collector.async_get_devices()
+        return joined, statuses(await collector.async_get_devices())
+
+    joined, result = run_against(controller, scenario, full_sync_polls=10)
+    assert result[joined] == "online"
+    assert controller.requests["stat/sta"] == 2
+
+
+def test_periodic_full_sync():
+    """The client table is fetched again every full_sync_polls polls."""
+    controller = UniFiController(clients=1)
+
+    async def scenario(collector):
+        for _ in range(7):
+            await collector.async_get_devices()
+
+    run_against(controller, scenario, full_sync_polls=3)
+    assert controller.requests["stat/sta"] == 2
+    assert controller.requests["stat/event"] == 5
+
+
+def test_events_in_the_same_millisecond_are_not_lost():
+    """An event stamped with the same time as the last one applied is still applied."""
+    controller = UniFiController(clients=2)
+    first, second = list(controller.clients)
+
+    async def scenario(collector):
+        await collector.async_get_devices()
+        controller.disconnect(first)
+        await collector.async_get_devices()
+        controller.disconnect(second)
+        controller.events[-1]["time"] = controller.events[-2]["time"]
+        return statuses(await collector.async_get_devices())
+
+    result = run_against(controller, scenario, full_sync_polls=10)
+    assert result[first] == "offline"
+    assert result[second] == "offline"
+
+
+
+@pytest.mark.parametrize("unifi_os", [False, True])
+def test_concurrent_polls_share_one_login(unifi_os):
+    """Summary and device polls started together log in once, also after expiry."""
+    controller = UniFiController(clients=2, unifi_os=unifi_os)
+
+    async def scenario(collector):
+        await asyncio.gather(collector.async_get_summary(), collector.async_get_devices())
+        first = controller.logins
+        controller.expire_sessions()
+        summary, _ = await asyncio.gather(
+            collector.async_get_summary(), collector.async_get_devices()
+        )
+        return first, summary
+
+    first, summary = run_against(controller, scenario)
+    assert first == 1
+    assert controller.logins == 2
+    assert summary["connected_devices"] == 2
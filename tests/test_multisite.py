@@ -0,0 +1,123 @@
+"""Tests for multi-site polling against the states simulator."""
+from __future__ import annotations
+
+import argparse
+import socket
+
+from common import run
+from networknest_simulator import load_integration_module, start_simulator
+
+api_module = load_integration_module("api")
+multisite = load_integration_module("multisite")
+
+
+def simulator_args() -> argparse.Namespace:
+    """Return simulator options for a small, fault-free network."""
+    return argparse.Namespace(
+        host="127.0.0.1", port=0, devices=5, churn=0.0, latency="fixed:1",
+        error_rate=0.0, hang_rate=0.0, hang_seconds=0.0, drip_rate=0.0,
+        drip_chunk=512, drip_interval=0.0, oversize_rate=0.0, oversize_bytes=0,
+    )
+
+
+def closed_port_url() -> str:
+    """Return a loopback URL nothing listens on."""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return f"http://127.0.0.1:{probe.getsockname()[1]}"
+
+
+def sites(url: str, names=("Home", "Office")) -> list[dict[str, str]]:
+    """Return site configs for a simulator URL."""
+    return [
+        {"name": name, "api_key": f"key_{index}", "base_url": url}
+        for index, name in enumerate(names)
+    ]
+
+
+def test_site_ids_survive_renames():
+    """Site IDs come from the API key and base URL, not the display name."""
+    before = multisite.NetworkNestMultiSiteAPI(sites("http://x", ("Home", "Office")))
+    after = multisite.NetworkNestMultiSiteAPI(sites("http://x", ("House", "Work")))
+    assert list(before.sites) == list(after.sites)
+
+    duplicates = multisite.NetworkNestMultiSiteAPI(
+        [{"name": name, "api_key": "key", "base_url": "http://x"} for name in ("a", "a", "a_1")]
+    )
+    assert len(duplicates.sites) == 3
+
+
+def sites_of(data):
+    """Return the site IDs of a merged payload in order."""
+    return list(data["sites"])
+
+
+def test_adding_a_site_keeps_the_main_device_ids():
+    """Devices of a single-site entry keep their IDs once sites are added."""
+
+    async def scenario():
+        runner, url, _ = await start_simulator(simulator_args())
+        single = api_module.NetworkNestAPI("key_0", url)
+        multi = multisite.NetworkNestMultiSiteAPI(sites(url, ("Main", "Office", "Cabin")))
+        try:
+            return await single.async_get_devices(), await multi.async_get_devices()
+        finally:
+            await single.close()
+            await multi.close()
+            await runner.cleanup()
+
+    single, multi = run(scenario())
+    main = sites_of(multi)[0]
+    assert {device["id"] for device in single["devices"]} == {
+        device["id"] for device in multi["devices"] if device["site"] == main
+    }
+    assert len({device["id"] for device in multi["devices"]}) == 15
+
+
+def test_summary_skips_devices_and_failing_site_keeps_its_devices():
+    """A failing site is marked unavailable and keeps its last devices."""
+
+    async def scenario():
+        runner, url, _ = await start_simulator(simulator_args())
+        client = multisite.NetworkNestMultiSiteAPI(sites(url))
+        try:
+            devices = await client.async_get_devices()
+            summary = await client.async_get_summary()
+            failing = next(iter(client.sites))
+            client.sites[failing]["api"].base_url = closed_port_url()
+            degraded = await client.async_get_devices()
+            return failing, devices, summary, degraded
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    failing, devices, summary, degraded = run(scenario())
+    assert len(devices["devices"]) == 10
+    home, office = sites_of(devices)
+    assert not any(device["id"].startswith("site_") for device in devices["devices"] if device["site"] == home)
+    assert all(device["id"].startswith(office + "_") for device in devices["devices"] if device["site"] == office)
+    assert "devices" not in summary
+    assert summary["connected_devices"] == devices["connected_devices"]
+    assert summary["network_status"] == "online"
+
+    assert degraded["sites"][failing]["available"] is False
+    assert degraded["network_status"] == "degraded"
+    assert len(degraded["devices"]) == 10
+    assert {
+        device["site_available"] for device in degraded["devices"] if device["site"] == failing
+    } == {False}
+
+
+def test_closed_client_does_not_reopen():
+    """After close, requests fail instead of opening a new session."""
+
+    async def scenario():
+        client = multisite.NetworkNestMultiSiteAPI(sites("http://127.0.0.1:9"))
+        await client.close()
+        try:
+            await client.async_get_summary()
+        except RuntimeError:
+            return client.session
+        raise AssertionError("closed client made a request")
+
+    assert run(scenario()) is None
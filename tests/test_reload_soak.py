@@ -0,0 +1,144 @@
+"""Reload soak test: repeated reloads must not leak sessions, sockets or tasks.
+
+Needs Home Assistant's test harness:
+
+    pip install pytest-homeassistant-custom-component
+    python -m pytest tests/test_reload_soak.py
+
+Set NETWORKNEST_SOAK_RELOADS to change the number of reloads (1000).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import logging
+import os
+from datetime import timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("pytest_homeassistant_custom_component")
+
+import aiohttp  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+from pytest_homeassistant_custom_component.common import (  # noqa: E402
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from custom_components.networknest.const import (  # noqa: E402
+    CONF_API_KEY,
+    CONF_BASE_URL,
+    DOMAIN,
+    UPDATE_INTERVAL,
+)
+from networknest_simulator import start_simulator  # noqa: E402
+
+RELOADS = int(os.environ.get("NETWORKNEST_SOAK_RELOADS", "1000"))
+WARMUP = 20
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Load the integration from custom_components."""
+    yield
+
+
+def simulator_args() -> argparse.Namespace:
+    """Return simulator options: a small network answering in 20 ms."""
+    return argparse.Namespace(
+        host="127.0.0.1", port=0, devices=20, churn=0.02, latency="fixed:20",
+        error_rate=0.0, hang_rate=0.0, hang_seconds=60.0, drip_rate=0.0,
+        drip_chunk=512, drip_interval=0.05, oversize_rate=0.0, oversize_bytes=0,
+    )
+
+
+def open_sockets() -> int:
+    """Return how many sockets this process has open."""
+    count = 0
+    for fd in os.listdir("/proc/self/fd"):
+        try:
+            count += os.readlink(f"/proc/self/fd/{fd}").startswith("socket:")
+        except OSError:
+            pass
+    return count
+
+
+def rss_kib() -> int:
+    """Return the resident set size of this process in KiB."""
+    with open("/proc/self/status", encoding="ascii") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def snapshot(hass) -> dict[str, int]:
+    """Return the resource counts that must stay flat across reloads."""
+    gc.collect()
+    return {
+        "sessions": sum(
+            1 for obj in gc.get_objects()
+            if isinstance(obj, aiohttp.ClientSession) and not obj.closed
+        ),
+        "sockets": open_sockets(),
+        "tasks": len(asyncio.all_tasks()),
+        "listeners": sum(hass.bus.async_listeners().values()),
+        "services": len(hass.services.async_services().get(DOMAIN, {})),
+        "rss_kib": rss_kib(),
+    }
+
+
+async def settle(hass) -> None:
+    """Let in-flight requests, cancellations and connection closes finish."""
+    for _ in range(3):
+        await hass.async_block_till_done()
+        await asyncio.sleep(0.05)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs procfs")
+async def test_reload_does_not_leak(hass, caplog):
+    """Reload an entry while manual and timed refreshes are in flight."""
+    # Captured setup logs would otherwise grow with every reload
+    caplog.set_level(logging.WARNING)
+    runner, url, _ = await start_simulator(simulator_args())
+    hass.http = MagicMock(async_register_static_paths=AsyncMock())
+    entry = MockConfigEntry(domain=DOMAIN, data={CONF_API_KEY: "soak", CONF_BASE_URL: url})
+    entry.add_to_hass(hass)
+
+    try:
+        with patch("custom_components.networknest.add_extra_js_url"):
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            await settle(hass)
+
+            now = dt_util.utcnow()
+            baseline = None
+            for reload in range(RELOADS):
+                # Leave a manual refresh and a timed refresh in flight over the reload
+                hass.async_create_task(
+                    hass.services.async_call(DOMAIN, "refresh_data", {}, blocking=True)
+                )
+                now += timedelta(seconds=UPDATE_INTERVAL + 1)
+                async_fire_time_changed(hass, now)
+                await asyncio.sleep(0)
+                assert await hass.config_entries.async_reload(entry.entry_id)
+                if reload + 1 == WARMUP:
+                    await settle(hass)
+                    baseline = snapshot(hass)
+
+            await settle(hass)
+            final = snapshot(hass)
+
+        assert baseline is not None, "NETWORKNEST_SOAK_RELOADS must exceed the warm-up"
+        for key in ("sessions", "sockets", "tasks", "listeners", "services"):
+            assert final[key] <= baseline[key], f"{key} grew: {baseline} -> {final}"
+        # Allow for allocator noise, not per-reload growth
+        assert final["rss_kib"] - baseline["rss_kib"] < 10 * 1024, f"{baseline} -> {final}"
+
+        assert await hass.config_entries.async_unload(entry.entry_id)
+        await settle(hass)
+        assert snapshot(hass)["sessions"] == 0
+    finally:
+        await runner.cleanup()
@@ -0,0 +1,205 @@
+"""Tests for the subnet scanner using loopback listeners."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from common import run
+from networknest_simulator import load_integration_module
+
+scanner_module = load_integration_module("scanner")
+
+SILENT_HOST = "203.0.113.1"
+
+
+class Listener:
+    """A loopback TCP listener counting the connections it accepts."""
+
+    def __init__(self) -> None:
+        self.accepted = 0
+        self.server: asyncio.Server | None = None
+        self.port = 0
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_server(self._accept, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def _accept(self, reader, writer) -> None:
+        self.accepted += 1
+        writer.close()
+
+    async def stop(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def make_scanner(subnets, ports, **options):
+    """Create a scanner with short timeouts."""
+    options.setdefault("timeout", 0.2)
+    return scanner_module.SubnetScanner(subnets, ports=ports, **options)
+
+
+def by_ip(devices):
+    """Return scan results keyed by IP."""
+    return {device["ip"]: device for device in devices}
+
+
+def test_parse_subnets():
+    """Subnets are normalised and bounded."""
+    assert scanner_module.parse_subnets("192.168.1.7/24, 10.0.0.0/30") == [
+        "192.168.1.0/24", "10.0.0.0/30",
+    ]
+    with pytest.raises(ValueError):
+        scanner_module.parse_subnets("10.0.0.0/8")
+    with pytest.raises(ValueError):
+        scanner_module.parse_subnets("fd00::/120")
+
+
+def test_open_and_refused_ports():
+    """A listening port is reported open; a refused one still proves the host is up."""
+
+    async def scenario():
+        listener = Listener()
+        await listener.start()
+        try:
+            scanner = make_scanner(["127.0.0.0/30"], (listener.port,))
+            return listener.port, by_ip(await scanner.async_scan())
+        finally:
+            await listener.stop()
+
+    port, devices = run(scenario())
+    assert devices["127.0.0.1"]["open_ports"] == [port]
+    assert devices["127.0.0.1"]["status"] == "online"
+    assert devices["127.0.0.2"]["open_ports"] == []
+    assert devices["127.0.0.2"]["status"] == "online"
+
+
+def silence(scanner, monkeypatch):
+    """Make every probe go unanswered and return the list of probed hosts.
+
+    Outbound connections may be intercepted by the test environment, so a
+    silent host is simulated rather than relied on.
+    """
+    probes = []
+
+    async def unanswered(host, port):
+        probes.append(host)
+
+    scanner._probe_port = unanswered
+    monkeypatch.setattr(scanner_module, "read_arp_table", dict)
+    return probes
+
+
+def test_silent_hosts_are_not_reported(monkeypatch):
+    """A host that never answers is left out until it has been seen."""
+    scanner = make_scanner([f"{SILENT_HOST}/32"], (80,))
+    silence(scanner, monkeypatch)
+    assert run(scanner.async_scan()) == []
+
+
+def test_silent_host_in_arp_table_is_online(monkeypatch):
+    """A host that drops TCP but answered ARP is up, with no open ports."""
+    scanner = make_scanner([f"{SILENT_HOST}/32"], (80,))
+    silence(scanner, monkeypatch)
+    monkeypatch.setattr(
+        scanner_module, "read_arp_table", lambda: {SILENT_HOST: "02:00:00:00:00:01"}
+    )
+    (device,) = run(scanner.async_scan())
+    assert device["status"] == "online"
+    assert device["open_ports"] == []
+    assert device["mac"] == "02:00:00:00:00:01"
+
+
+def test_rescan_only_probes_expired_hosts():
+    """Cached results are reused until their TTL expires."""
+
+    async def scenario():
+        listener = Listener()
+        await listener.start()
+        try:
+            scanner = make_scanner(["127.0.0.1/32"], (listener.port,), alive_ttl=0.3)
+            await scanner.async_scan()
+            first = listener.accepted
+            await scanner.async_scan()
+            cached = listener.accepted
+            await asyncio.sleep(0.35)
+            await scanner.async_scan()
+            await asyncio.sleep(0.05)
+            return first, cached, listener.accepted
+        finally:
+            await listener.stop()
+
+    first, cached, expired = run(scenario())
+    assert first == 1
+    assert cached == 1
+    assert expired == 2
+
+
+def test_dead_ttl_applies_to_silent_hosts(monkeypatch):
+    """Silent hosts are skipped until the dead TTL expires."""
+    scanner = make_scanner([f"{SILENT_HOST}/32"], (80,), dead_ttl=0.3)
+    probes = silence(scanner, monkeypatch)
+
+    async def scenario():
+        await scanner.async_scan()
+        await scanner.async_scan()
+        await asyncio.sleep(0.35)
+        await scanner.async_scan()
+
+    run(scenario())
+    assert probes == [SILENT_HOST, SILENT_HOST]
+
+
+def test_incremental_rescan_of_a_larger_subnet():
+    """After the first sweep, a rescan within the TTL does not probe at all."""
+
+    async def scenario():
+        listener = Listener()
+        await listener.start()
+        try:
+            scanner = make_scanner(["127.0.0.0/24"], (listener.port,))
+            start = time.monotonic()
+            first = await scanner.async_scan()
+            sweep = time.monotonic() - start
+            start = time.monotonic()
+            second = await scanner.async_scan()
+            return first, second, sweep, time.monotonic() - start
+        finally:
+            await listener.stop()
+
+    first, second, sweep, rescan = run(scenario())
+    assert len(first) == len(second) == 254
+    assert rescan < sweep
+
+
+def test_ports_of_a_host_are_probed_together(monkeypatch):
+    """A silent host costs one timeout, and the first refusal settles a host."""
+    scanner = make_scanner([f"{SILENT_HOST}/31"], (22, 80, 443, 445))
+    monkeypatch.setattr(scanner_module, "read_arp_table", dict)
+    hanging = []
+
+    async def probe(host, port):
+        if host == SILENT_HOST:
+            await asyncio.sleep(scanner.timeout)
+            return None
+        if port == 443:
+            return False
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            hanging.append(port)
+            raise
+
+    scanner._probe_port = probe
+
+    async def scenario():
+        start = time.monotonic()
+        devices = await scanner.async_scan()
+        return devices, time.monotonic() - start
+
+    devices, elapsed = run(scenario())
+    assert elapsed < 2 * scanner.timeout
+    assert [device["ip"] for device in devices] == ["203.0.113.0"]
+    assert sorted(hanging) == [22, 80, 445]
@@ -0,0 +1,71 @@
+"""Tests for the manual refresh scheduler."""
+from __future__ import annotations
+
+import asyncio
+
+from common import run
+from networknest_simulator import load_integration_module
+
+scheduler_module = load_integration_module("scheduler")
+
+
+class FakeCoordinator:
+    """Coordinator stand-in that, like DataUpdateCoordinator, never raises."""
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.refreshes = 0
+        self.last_update_success = True
+        self.last_exception: Exception | None = None
+
+    async def async_refresh(self) -> None:
+        self.refreshes += 1
+        await asyncio.sleep(0.01)
+        self.last_update_success = not self.fail
+        self.last_exception = RuntimeError("site down") if self.fail else None
+
+
+def test_concurrent_refreshes_are_coalesced():
+    """Overlapping requests for one entry share a single refresh."""
+    coordinator = FakeCoordinator()
+    scheduler = scheduler_module.RefreshScheduler(rate=100, burst=10)
+
+    async def scenario():
+        return await asyncio.gather(
+            *(scheduler.async_refresh("entry", coordinator, "key") for _ in range(5))
+        )
+
+    results = run(scenario())
+    assert coordinator.refreshes == 1
+    assert results.count(True) == 4
+    assert scheduler.coalesced == 4
+
+
+def test_failures_are_read_from_the_coordinator():
+    """A refresh the coordinator swallowed still counts as failed."""
+    healthy, failing = FakeCoordinator(), FakeCoordinator(fail=True)
+    scheduler = scheduler_module.RefreshScheduler(rate=100, burst=10)
+
+    result = run(
+        scheduler.async_refresh_many(
+            [("healthy", healthy, "key"), ("failing", failing, "other")]
+        )
+    )
+    assert result["entries"] == 2
+    assert result["failed"] == 1
+
+
+def test_every_key_of_an_entry_is_rate_limited():
+    """An entry polling several API keys waits for the emptiest bucket."""
+    scheduler = scheduler_module.RefreshScheduler(rate=10, burst=1)
+    single, multi = FakeCoordinator(), FakeCoordinator()
+
+    async def scenario():
+        await scheduler.async_refresh("single", single, "office")
+        start = asyncio.get_running_loop().time()
+        await scheduler.async_refresh("multi", multi, ("main", "office"))
+        return asyncio.get_running_loop().time() - start
+
+    # The office key's only token went to the first refresh
+    assert run(scenario()) >= 0.08
+    assert multi.refreshes == 1